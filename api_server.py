@@ -0,0 +1,255 @@
+import argparse
+import bisect
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+DATA_FOLDER = "data"
+RISK_HISTORY_FILE = os.path.join(DATA_FOLDER, "risk_history.csv")
+NEWS_LOG_FILE = os.path.join(DATA_FOLDER, "daily_news_scan.csv")
+DEFAULT_PROFILE = "sri_lanka"
+
+# Local only by default; serving other machines is an explicit --host 0.0.0.0.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+REFRESH_INTERVAL = 30
+CACHE_MAX_AGE = 15
+GZIP_MIN_BYTES = 512
+RESPONSE_CACHE_LIMIT = 256
+HISTORY_MAX_ROWS = 5000
+
+NUMERIC_FIELDS = ["Total_Risk", "News_Risk", "Economic_Risk", "Environmental_Risk", "Social_Risk",
+                  "USD", "Oil_Price", "Momentum"]
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+_LOCK = threading.Lock()
+# {profile: {"latest": dict, "history": [dict], "history_keys": [str]}} plus a version counter.
+_SNAPSHOT = {"version": 0, "profiles": {}}
+_RESPONSE_CACHE = {}
+_DISK_MTIMES = {}
+
+
+def _coerce_row(row):
+    for field in NUMERIC_FIELDS:
+        if row.get(field) not in (None, ""):
+            try:
+                value = float(row[field])
+                row[field] = int(value) if value.is_integer() and field != "USD" and field != "Oil_Price" else value
+            except ValueError:
+                pass
+    if "Anomaly_Flag" in row:
+        row["Anomaly_Flag"] = str(row["Anomaly_Flag"]) == "True"
+    return row
+
+
+def read_history_csv(path):
+    """risk_history.csv as a list of dicts; tolerates the older rows written without Oil_Price."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return rows
+        with_oil = header
+        if "Oil_Price" not in header and "USD" in header:
+            with_oil = header[:header.index("USD") + 1] + ["Oil_Price"] + header[header.index("USD") + 1:]
+        for values in reader:
+            if len(values) == len(with_oil):
+                rows.append(_coerce_row(dict(zip(with_oil, values))))
+            elif len(values) == len(header):
+                rows.append(_coerce_row(dict(zip(header, values))))
+    rows.sort(key=lambda r: r.get("Timestamp", ""))
+    return rows[-HISTORY_MAX_ROWS:]
+
+
+def read_news_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        try:
+            row["Risk"] = int(float(row.get("Risk", 0)))
+        except ValueError:
+            row["Risk"] = 0
+    return rows
+
+
+def publish_snapshot(profile, latest, history=None):
+    """Swaps in a new snapshot for one profile. `history=None` appends `latest` to the existing history."""
+    with _LOCK:
+        current = _SNAPSHOT["profiles"].get(profile, {"history": []})
+        if history is None:
+            record = {k: v for k, v in latest.items() if k != "Headlines"}
+            history = (current["history"] + [record])[-HISTORY_MAX_ROWS:]
+        _SNAPSHOT["profiles"][profile] = {
+            "latest": latest,
+            "history": history,
+            "history_keys": [row.get("Timestamp", "") for row in history],
+        }
+        _SNAPSHOT["version"] += 1
+        _RESPONSE_CACHE.clear()
+
+
+def publish_run(records):
+    """Called after run_scraper with its {profile: latest record incl. Headlines} result."""
+    for profile, record in records.items():
+        publish_snapshot(profile, record)
+    logging.info(f"📮 API snapshot refreshed ({', '.join(records)})")
+
+
+def refresh_from_disk(force=False):
+    """Rebuilds the default profile's snapshot from the CSVs when they have changed."""
+    mtimes = {}
+    for path in (RISK_HISTORY_FILE, NEWS_LOG_FILE):
+        mtimes[path] = os.path.getmtime(path) if os.path.exists(path) else None
+    if not force and mtimes == _DISK_MTIMES:
+        return False
+    _DISK_MTIMES.clear()
+    _DISK_MTIMES.update(mtimes)
+
+    history = read_history_csv(RISK_HISTORY_FILE) if mtimes[RISK_HISTORY_FILE] else []
+    headlines = read_news_csv(NEWS_LOG_FILE) if mtimes[NEWS_LOG_FILE] else []
+    if not history:
+        return False
+    latest = {**history[-1], "Headlines": headlines}
+    publish_snapshot(DEFAULT_PROFILE, latest, history)
+    logging.info(f"📮 API snapshot loaded from disk ({len(history)} rows, {len(headlines)} headlines)")
+    return True
+
+
+def _encode(payload):
+    body = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+    return body, compressed, etag
+
+
+def _filter_headlines(headlines, query):
+    min_risk = int(query.get("min_risk", ["0"])[0] or 0)
+    sector = query.get("sector", [None])[0]
+    limit = int(query.get("limit", ["100"])[0] or 100)
+    result = [h for h in headlines if h.get("Risk", 0) >= min_risk and (not sector or h.get("Sector") == sector)]
+    return result[:limit]
+
+
+def _history_range(entry, query):
+    start = query.get("start", [""])[0]
+    end = query.get("end", [""])[0]
+    limit = int(query.get("limit", [str(HISTORY_MAX_ROWS)])[0] or HISTORY_MAX_ROWS)
+    keys = entry["history_keys"]
+    # Timestamps are "YYYY-MM-DD HH:MM:SS", so string order is time order.
+    lo = bisect.bisect_left(keys, start) if start else 0
+    hi = bisect.bisect_right(keys, end + "￿") if end else len(keys)
+    rows = entry["history"][lo:hi]
+    return rows[-limit:]
+
+
+def build_response(path, query):
+    """Returns (status, encoded body tuple) for an API path, memoised per snapshot version."""
+    cache_key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+    with _LOCK:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached:
+            return cached
+        profiles = _SNAPSHOT["profiles"]
+        version = _SNAPSHOT["version"]
+
+    profile = query.get("profile", [DEFAULT_PROFILE])[0]
+    entry = profiles.get(profile)
+
+    if path == "/healthz":
+        result = (200, _encode({"status": "ok", "version": version, "profiles": sorted(profiles)}))
+    elif entry is None:
+        result = (503 if not profiles else 404, _encode({"error": f"no snapshot for profile '{profile}'"}))
+    elif path == "/v1/latest":
+        result = (200, _encode(entry["latest"]))
+    elif path == "/v1/headlines":
+        result = (200, _encode(_filter_headlines(entry["latest"].get("Headlines", []), query)))
+    elif path == "/v1/history":
+        result = (200, _encode(_history_range(entry, query)))
+    else:
+        result = (404, _encode({"error": "not found", "paths": ["/v1/latest", "/v1/headlines", "/v1/history", "/healthz"]}))
+
+    with _LOCK:
+        if version == _SNAPSHOT["version"]:
+            if len(_RESPONSE_CACHE) >= RESPONSE_CACHE_LIMIT:
+                _RESPONSE_CACHE.clear()
+            _RESPONSE_CACHE[cache_key] = result
+    return result
+
+
+class RiskAPIHandler(BaseHTTPRequestHandler):
+    server_version = "VitaRiskAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            status, (body, compressed, etag) = build_response(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except ValueError as e:
+            status, (body, compressed, etag) = 400, _encode({"error": str(e)})
+
+        use_gzip = compressed is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            etag = etag[:-1] + '-gz"'
+
+        if status == 200 and etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = compressed if use_gzip else body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.debug(f"API {self.address_string()} {format % args}")
+
+
+def start_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Starts the API on a background thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), RiskAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="vita-api", daemon=True).start()
+    logging.info(f"🌐 Risk API listening on http://{host}:{port}/v1/latest")
+    return server
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Serve the latest Vita.lk risk snapshot over HTTP")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST,
+                            help="Address to bind (default: localhost only; 0.0.0.0 for every interface).")
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--refresh", type=int, default=REFRESH_INTERVAL,
+                            help="Seconds between checks of the CSVs for new scraper output.")
+    args = arg_parser.parse_args()
+
+    refresh_from_disk(force=True)
+    start_server(args.host, args.port)
+    try:
+        while True:
+            time.sleep(args.refresh)
+            refresh_from_disk()
+    except KeyboardInterrupt:
+        pass
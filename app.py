@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import io
 import os
 import json
 import ast
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+import transport
 
 st.set_page_config(
     page_title="Vita.lk | Command Center",
@@ -12,14 +15,23 @@ st.set_page_config(
     layout="wide"
 )
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-    
-    if not firebase_admin._apps:
+@st.cache_resource
+def get_firestore_client():
+    """
+    Initialises Firebase once per server process and shares the client across sessions.
+    Returns (client or None, (where, level, message)) so the status can be shown on every run.
+    """
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        
+        if firebase_admin._apps:
+            return firestore.client(), None
+
         if "FIREBASE_KEY" in st.secrets:
             secret_value = st.secrets["FIREBASE_KEY"]
             key_dict = None
+            status = None
 
             if isinstance(secret_value, dict):
                 key_dict = secret_value
@@ -30,61 +42,106 @@ try:
                     try:
                         key_dict = ast.literal_eval(secret_value)
                     except Exception:
-                        st.sidebar.error("⚠️ Secrets Parsing Error: Check JSON format.")
+                        status = ("sidebar", "error", "⚠️ Secrets Parsing Error: Check JSON format.")
 
             if key_dict:
+                key_dict = dict(key_dict)
                 if "private_key" in key_dict:
                     key_dict["private_key"] = key_dict["private_key"].replace("\\n", "\n")
 
                 cred = credentials.Certificate(key_dict)
                 firebase_admin.initialize_app(cred)
-                DB = firestore.client()
-                ST_FIRESTORE_ENABLED = True
-                st.sidebar.success("🔥 Firestore Connected (Cloud)")
-            else:
-                DB = None
-                ST_FIRESTORE_ENABLED = False
+                return firestore.client(), ("sidebar", "success", "🔥 Firestore Connected (Cloud)")
+            return None, status
             
         elif os.path.exists("data/serviceAccountKey.json"):
             cred = credentials.Certificate("data/serviceAccountKey.json")
             firebase_admin.initialize_app(cred)
-            DB = firestore.client()
-            ST_FIRESTORE_ENABLED = True
-            st.sidebar.success("🔥 Firestore Connected (Local)")
+            return firestore.client(), ("sidebar", "success", "🔥 Firestore Connected (Local)")
         else:
-            DB = None
-            ST_FIRESTORE_ENABLED = False
-            st.sidebar.warning("⚠️ Access Key Missing. Live data disabled.")
-    else:
-        DB = firestore.client()
-        ST_FIRESTORE_ENABLED = True
+            return None, ("sidebar", "warning", "⚠️ Access Key Missing. Live data disabled.")
+
+    except Exception as e:
+        return None, ("main", "error", f"🔥 Database Connection Failed: {e}")
 
-except Exception as e:
-    DB = None
-    ST_FIRESTORE_ENABLED = False
-    st.error(f"🔥 Database Connection Failed: {e}")
+
+DB, _db_status = get_firestore_client()
+ST_FIRESTORE_ENABLED = DB is not None
+if DB is None:
+    # Only a working client is shared; a failed or unconfigured init is retried on the next run.
+    get_firestore_client.clear()
+if _db_status:
+    _where, _level, _message = _db_status
+    getattr(st.sidebar if _where == "sidebar" else st, _level)(_message)
 
 GITHUB_USER = "usmaanimran"
 REPO_NAME = "vita_lk"
 BRANCH = "main"
-BASE_URL = f"https://raw.githubusercontent.com/{GITHUB_USER}/{REPO_NAME}/{BRANCH}/"
+# VITA_BASE_URL points the Cloud charts at another copy of the repo (e.g. loadtest.py's local server).
+BASE_URL = os.environ.get("VITA_BASE_URL", f"https://raw.githubusercontent.com/{GITHUB_USER}/{REPO_NAME}/{BRANCH}/")
 CANVAS_APP_ID = "sl_risk_monitor"
 CANVAS_USER_ID = "backend_service_user"
 
-@st.cache_data(ttl=30)
+NEWS_PAGE_SIZE = 25
+NEWS_TIME_RANGES = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "All time": None}
+NEWS_SECTORS = ["All", "Economic", "Social", "Political", "Environmental", "Health", "Security", "Energy",
+                "Infrastructure", "Logistics", "Transport", "Supply_chain", "Labor", "Industrial", "Cyber",
+                "General", "Uncategorized"]
+# Scraper timestamps are Sri Lanka local time; UTC+5:30 with no DST.
+SL_UTC_OFFSET = timedelta(hours=5, minutes=30)
+
+@st.cache_resource(ttl=30)
 def fetch_risk_history_for_charting(source_mode):
+    """
+    Reads, parses and sorts the history once per TTL for all sessions.
+    The frame is shared between sessions, so callers must not modify it.
+    """
     try:
         if source_mode == "Cloud":
-            remote_url = BASE_URL + "data/risk_history.csv"
-            return pd.read_csv(remote_url, storage_options={'User-Agent': 'Mozilla/5.0'})
+            # Through the scraper's keep-alive transport, so reruns reuse the connection.
+            response = transport.get(BASE_URL + "data/risk_history.csv")
+            response.raise_for_status()
+            df = pd.read_csv(io.BytesIO(response.content))
         else:
             local_path = os.path.join("data", "risk_history.csv")
-            if os.path.exists(local_path):
-                return pd.read_csv(local_path)
-            return None
+            if not os.path.exists(local_path):
+                return None
+            df = pd.read_csv(local_path)
     except Exception:
         return None
 
+    try:
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+        return df.sort_values('Timestamp').reset_index(drop=True)
+    except Exception:
+        return None
+
+def history_version(df_chart):
+    """Cheap key that changes whenever a new row lands: (last timestamp, row count)."""
+    return (str(df_chart['Timestamp'].iloc[-1]), len(df_chart))
+
+@st.cache_resource(max_entries=4)
+def build_trend_figure(source_mode, data_version):
+    df_chart = fetch_risk_history_for_charting(source_mode)
+    risk_cols = ['Total_Risk', 'Economic_Risk', 'Social_Risk', 'Environmental_Risk', 'News_Risk']
+    available_cols = [c for c in risk_cols if c in df_chart.columns]
+    
+    fig = px.line(df_chart, x='Timestamp', y=available_cols, markers=True, 
+                  color_discrete_map={"Total_Risk": "#FF4B4B", "Economic_Risk": "#1E88E5", 
+                                      "Social_Risk": "#FFC107", "Environmental_Risk": "#00C853", "News_Risk": "#9C27B0"})
+    fig.update_traces(line=dict(width=2))
+    fig.for_each_trace(lambda t: t.update(line=dict(width=4)) if t.name == 'Total_Risk' else None)
+    fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=380, hovermode="x unified", xaxis_title=None, yaxis_title="Risk Score")
+    return fig
+
+@st.cache_resource(max_entries=16)
+def build_pie_figure(pie_items):
+    df_pie = pd.DataFrame(list(pie_items), columns=['Factor', 'Score'])
+    fig_pie = px.pie(df_pie, values='Score', names='Factor', hole=0.4, color_discrete_sequence=px.colors.sequential.RdBu)
+    fig_pie.update_layout(margin=dict(l=0, r=0, t=0, b=0), height=300)
+    return fig_pie
+
+@st.cache_data(ttl=15)
 def fetch_live_data():
     if not DB: return None
     try:
@@ -97,6 +154,91 @@ def fetch_live_data():
         st.warning(f"Live stream error: {e}") 
         return None
 
+@st.cache_data(ttl=60, max_entries=256)
+def fetch_news_page(sector, min_risk, since, cursor):
+    """
+    One page of newsHistory, newest first. Every filter combination maps onto a composite
+    index in firestore.indexes.json. `cursor` is [Timestamp, Risk, doc id] of the last row
+    on the previous page. Returns (rows, cursor for the next page or None).
+    """
+    if not DB: return [], None
+    try:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+        from google.cloud.firestore import Query
+
+        query = DB.collection(f'artifacts/{CANVAS_APP_ID}/users/{CANVAS_USER_ID}/newsHistory')
+        if sector != "All":
+            query = query.where(filter=FieldFilter("Sector", "==", sector))
+        if since:
+            query = query.where(filter=FieldFilter("Timestamp", ">=", since))
+        if min_risk > 0:
+            query = query.where(filter=FieldFilter("Risk", ">=", min_risk))
+        query = (query.order_by("Timestamp", direction=Query.DESCENDING)
+                      .order_by("Risk", direction=Query.DESCENDING)
+                      .order_by("__name__", direction=Query.DESCENDING))
+        if cursor:
+            query = query.start_after(list(cursor))
+
+        # One extra document tells us whether an older page exists without another query.
+        docs = list(query.limit(NEWS_PAGE_SIZE + 1).stream())
+        rows = [doc.to_dict() for doc in docs[:NEWS_PAGE_SIZE]]
+        next_cursor = None
+        if len(docs) > NEWS_PAGE_SIZE:
+            last = docs[NEWS_PAGE_SIZE - 1]
+            next_cursor = (rows[-1].get("Timestamp"), rows[-1].get("Risk"), last.id)
+        return rows, next_cursor
+    except Exception as e:
+        st.warning(f"News archive error: {e}")
+        return [], None
+
+def news_archive():
+    st.markdown("### 🗄️ Intelligence Archive")
+    if not DB:
+        st.info("News archive needs the Firestore connection.")
+        return
+
+    f1, f2, f3 = st.columns(3)
+    sector = f1.selectbox("Sector", NEWS_SECTORS, key="archive_sector")
+    min_risk = f2.slider("Minimum risk", 0, 100, 0, step=5, key="archive_min_risk")
+    time_range = f3.selectbox("Time range", list(NEWS_TIME_RANGES), index=1, key="archive_range")
+
+    since = None
+    if NEWS_TIME_RANGES[time_range]:
+        # Rounded to the hour so the cached pages stay valid across reruns.
+        now_sl = datetime.now(timezone.utc).replace(tzinfo=None) + SL_UTC_OFFSET
+        since = (now_sl - timedelta(days=NEWS_TIME_RANGES[time_range])).strftime("%Y-%m-%d %H:00:00")
+
+    # Stack of cursors for the pages seen so far; reset whenever a filter changes.
+    filters = (sector, min_risk, since)
+    if st.session_state.get("archive_filters") != filters:
+        st.session_state.archive_filters = filters
+        st.session_state.archive_cursors = [None]
+
+    cursors = st.session_state.archive_cursors
+    rows, next_cursor = fetch_news_page(sector, min_risk, since, cursors[-1])
+
+    if rows:
+        st.dataframe(
+            pd.DataFrame(rows, columns=["Timestamp", "Headline", "Risk", "Sector", "Link"]),
+            column_config={
+                "Link": st.column_config.LinkColumn("Source"),
+                "Risk": st.column_config.ProgressColumn("Risk Score", format="%d", min_value=0, max_value=100),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("No archived headlines match these filters.")
+
+    p1, p2, p3 = st.columns([1, 2, 1])
+    if p1.button("◀ Newer", disabled=len(cursors) == 1, key="archive_newer"):
+        cursors.pop()
+        st.rerun()
+    p2.caption(f"Page {len(cursors)}")
+    if p3.button("Older ▶", disabled=next_cursor is None, key="archive_older"):
+        cursors.append(next_cursor)
+        st.rerun()
+
 st.markdown("""
     <style>
     .block-container { padding-top: 1rem; } 
@@ -166,20 +308,9 @@ def main_dashboard(source_mode, live_data):
     
     if df_chart is not None and not df_chart.empty:
         try:
-            df_chart['Timestamp'] = pd.to_datetime(df_chart['Timestamp'])
-            df_chart = df_chart.sort_values('Timestamp')
-            
             with chart_col1:
                 st.markdown("**Synergy Risk Trend**")
-                risk_cols = ['Total_Risk', 'Economic_Risk', 'Social_Risk', 'Environmental_Risk', 'News_Risk']
-                available_cols = [c for c in risk_cols if c in df_chart.columns]
-                
-                fig = px.line(df_chart, x='Timestamp', y=available_cols, markers=True, 
-                              color_discrete_map={"Total_Risk": "#FF4B4B", "Economic_Risk": "#1E88E5", 
-                                                  "Social_Risk": "#FFC107", "Environmental_Risk": "#00C853", "News_Risk": "#9C27B0"})
-                fig.update_traces(line=dict(width=2))
-                fig.for_each_trace(lambda t: t.update(line=dict(width=4)) if t.name == 'Total_Risk' else None)
-                fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=380, hovermode="x unified", xaxis_title=None, yaxis_title="Risk Score")
+                fig = build_trend_figure(source_mode, history_version(df_chart))
                 st.plotly_chart(fig, use_container_width=True)
 
             with chart_col2:
@@ -192,9 +323,7 @@ def main_dashboard(source_mode, live_data):
                 }
                 pie_data = {k: v for k, v in pie_data.items() if v > 0}
                 if pie_data:
-                    df_pie = pd.DataFrame(list(pie_data.items()), columns=['Factor', 'Score'])
-                    fig_pie = px.pie(df_pie, values='Score', names='Factor', hole=0.4, color_discrete_sequence=px.colors.sequential.RdBu)
-                    fig_pie.update_layout(margin=dict(l=0, r=0, t=0, b=0), height=300)
+                    fig_pie = build_pie_figure(tuple(pie_data.items()))
                     st.plotly_chart(fig_pie, use_container_width=True)
         except Exception:
             st.info("Chart data processing error.")
@@ -220,6 +349,8 @@ def main_dashboard(source_mode, live_data):
     else:
         st.info("No live news data available.")
 
+    news_archive()
+
 def system_footer():
     st.sidebar.markdown("---")
     
@@ -231,6 +362,7 @@ def system_footer():
     
     if st.sidebar.button("🔄 Force Refresh"):
         st.cache_data.clear()
+        fetch_risk_history_for_charting.clear()
         st.rerun()
 
     live_data = fetch_live_data() 
@@ -0,0 +1,264 @@
+import argparse
+import csv
+import datetime
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import scraper
+
+
+BACKFILL_FOLDER = os.path.join(scraper.DATA_FOLDER, "backfill")
+RESCORED_HISTORY_FILE = os.path.join(BACKFILL_FOLDER, "risk_history_rescored.csv")
+HISTORY_DIFF_FILE = os.path.join(BACKFILL_FOLDER, "risk_history_diff.csv")
+NEWS_DIFF_FILE = os.path.join(BACKFILL_FOLDER, "news_rescored_diff.csv")
+
+NEWS_WINDOW = datetime.timedelta(hours=scraper.NEWS_WINDOW_HOURS)
+EMERGING_PREFIX = "⚠️ Emerging Trend: "
+DEFAULT_BATCH_SIZE = 500
+RISK_FIELDS = ["Total_Risk", "News_Risk", "Economic_Risk", "Environmental_Risk", "Social_Risk"]
+# The only columns --apply writes back; USD/Oil_Price keep what was stored, blanks included.
+APPLIED_FIELDS = RISK_FIELDS + ["Momentum", "Anomaly_Flag"]
+
+
+def history_columns(header):
+    """Column names for the rows written after Oil_Price was added to the record."""
+    if "Oil_Price" in header:
+        return header
+    return header[:header.index("USD") + 1] + ["Oil_Price"] + header[header.index("USD") + 1:]
+
+
+def load_risk_history(path=scraper.RISK_HISTORY_FILE):
+    """
+    Reads risk_history.csv row by row. Older rows were written before Oil_Price
+    was added to the record, so the file mixes 10 and 11 column rows under one header.
+    """
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        with_oil = history_columns(header)
+        for line, values in enumerate(reader):
+            if len(values) == len(with_oil):
+                rows.append({**dict(zip(with_oil, values)), "Source_Line": line})
+            elif len(values) == len(header):
+                rows.append({**dict(zip(header, values)), "Source_Line": line})
+            else:
+                logging.warning(f"Malformed history row not re-scored (kept as is by --apply): {values[:1]}")
+
+    df = pd.DataFrame(rows, columns=with_oil + ["Source_Line"])
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    df = df.dropna(subset=["Timestamp"])
+    for col in RISK_FIELDS + ["USD", "Oil_Price", "Momentum"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    # Oil was not always recorded; carry the nearest known price, else the scraper's default.
+    # The imputed prices are only used for re-scoring and never written back (see apply_rescored_history).
+    df["Oil_Price"] = df["Oil_Price"].ffill().bfill().fillna(75.0)
+    df["USD"] = df["USD"].ffill().bfill().fillna(300.0)
+    return df.sort_values("Timestamp").reset_index(drop=True)
+
+
+def load_news_history(source):
+    if source == "firestore":
+        if not scraper.DB:
+            raise RuntimeError("Firestore is not configured; use --news-source csv")
+        collection = scraper.DB.collection(
+            f'artifacts/{scraper.CANVAS_APP_ID}/users/{scraper.CANVAS_USER_ID}/newsHistory'
+        )
+        df = pd.DataFrame([doc.to_dict() for doc in collection.stream()])
+    else:
+        df = pd.read_csv(scraper.NEWS_LOG_FILE)
+
+    if df.empty:
+        return df
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    df["Risk"] = pd.to_numeric(df["Risk"], errors="coerce").fillna(0).astype(int)
+    return df.dropna(subset=["Timestamp", "Headline"]).reset_index(drop=True)
+
+
+def rescore_batch(headlines):
+    """Worker entry point: scores a batch of raw headlines with the current keyword tables."""
+    results = []
+    for headline in headlines:
+        if headline.startswith(EMERGING_PREFIX):
+            # The detector only sees the full scan, which is not stored. A trend that now
+            # contains a known keyword would have been dropped; otherwise keep the stored score.
+            phrase = headline[len(EMERGING_PREFIX):].lower()
+            if scraper.is_known_risk_phrase(phrase):
+                results.append((0, "Uncategorized"))
+            else:
+                results.append((None, "Uncategorized"))
+            continue
+
+        title_raw = headline.lower()
+        if any(k in title_raw for k in scraper.IGNORE_KEYWORDS):
+            results.append((0, "Ignored"))
+            continue
+        score, sector_tag = scraper.match_risk_keywords(title_raw)
+        score += scraper.sentiment_boost(title_raw)
+        results.append((score, sector_tag))
+    return results
+
+
+def rescore_headlines(news_df, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Re-scores each distinct headline once, fanning batches out over a process pool."""
+    unique_titles = list(dict.fromkeys(news_df["Headline"].astype(str)))
+    batches = [unique_titles[i:i + batch_size] for i in range(0, len(unique_titles), batch_size)]
+    logging.info(f"Re-scoring {len(unique_titles)} unique headlines in {len(batches)} batches...")
+
+    scores = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch, results in zip(batches, pool.map(rescore_batch, batches)):
+            scores.update(zip(batch, results))
+
+    rescored = news_df.copy()
+    new_values = rescored["Headline"].astype(str).map(scores)
+    rescored["New_Risk"] = [
+        old if new[0] is None else new[0] for old, new in zip(rescored["Risk"], new_values)
+    ]
+    rescored["New_Sector"] = [new[1] for new in new_values]
+    rescored["Delta"] = rescored["New_Risk"] - rescored["Risk"]
+    return rescored
+
+
+def rescore_history(history_df, rescored_news):
+    """
+    Recomputes each risk_history row with the current formulas.
+    Weather readings are not persisted, so Environmental_Risk is carried over as stored;
+    News_Risk is shifted by the score change of the headlines logged in its news window.
+    """
+    news = rescored_news.sort_values("Timestamp")
+    news_times = news["Timestamp"].values
+    cumulative_delta = news["Delta"].cumsum().values
+
+    def window_delta(ts):
+        hi = news_times.searchsorted(ts.to_datetime64(), side="right")
+        lo = news_times.searchsorted((ts - NEWS_WINDOW).to_datetime64(), side="right")
+        if hi == 0:
+            return 0
+        return cumulative_delta[hi - 1] - (cumulative_delta[lo - 1] if lo > 0 else 0)
+
+    out = history_df.copy()
+    new_news, new_eco, new_social, new_total = [], [], [], []
+    for row in out.itertuples(index=False):
+        news_risk = int(min(100, max(0, row.News_Risk + window_delta(row.Timestamp))))
+        eco_risk = scraper.calculate_continuous_economy_risk(row.USD, row.Oil_Price)
+        social_risk = scraper.calculate_social_risk(news_risk, eco_risk)
+        total = scraper.calculate_weighted_total_risk(news_risk, eco_risk, row.Environmental_Risk, social_risk)
+        new_news.append(news_risk)
+        new_eco.append(eco_risk)
+        new_social.append(social_risk)
+        new_total.append(total)
+
+    out["News_Risk"] = new_news
+    out["Economic_Risk"] = new_eco
+    out["Social_Risk"] = new_social
+    out["Total_Risk"] = new_total
+
+    # Momentum and the anomaly flag depend on the previous rows, so they follow the new totals.
+    totals = out["Total_Risk"]
+    out["Momentum"] = totals.diff().fillna(0).astype(int)
+    window_mean = totals.shift(1).rolling(24, min_periods=2).mean()
+    window_std = totals.shift(1).rolling(24, min_periods=2).std()
+    out["Anomaly_Flag"] = ((window_std > 0.01) & ((totals - window_mean) / window_std > 2.0)).fillna(False)
+    return out
+
+
+def build_history_diff(old_df, new_df):
+    diff = pd.DataFrame({"Timestamp": old_df["Timestamp"]})
+    for col in RISK_FIELDS:
+        diff[f"{col}_Old"] = old_df[col]
+        diff[f"{col}_New"] = new_df[col]
+        diff[f"{col}_Delta"] = new_df[col] - old_df[col]
+    changed = (diff[[f"{col}_Delta" for col in RISK_FIELDS]] != 0).any(axis=1)
+    return diff[changed]
+
+
+def apply_rescored_history(rescored, path=scraper.RISK_HISTORY_FILE):
+    """
+    Writes the re-scored APPLIED_FIELDS back into risk_history.csv, matched by source line.
+    Every other cell, malformed rows and rows appended since the backfill loaded the file are
+    copied through unchanged. Holds the scraper's lock on the file while it is replaced.
+    """
+    by_line = {int(row["Source_Line"]): row for row in rescored.to_dict("records")}
+    with scraper.file_lock(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            lines = list(csv.reader(f))
+        header = lines[0]
+        with_oil = history_columns(header)
+        for line, values in enumerate(lines[1:]):
+            row = by_line.get(line)
+            if row is None:
+                continue
+            columns = with_oil if len(values) == len(with_oil) else header
+            for field in APPLIED_FIELDS:
+                if field in columns:
+                    values[columns.index(field)] = str(row[field])
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f, lineterminator="\n").writerows(lines)
+        os.replace(tmp_path, path)
+
+
+def uncovered_rows(history_df, news_df):
+    """
+    Risk rows whose news window starts before the first stored headline. Their News_Risk can
+    only be shifted by the part of the window the headlines cover.
+    """
+    if news_df.empty:
+        return len(history_df)
+    return int((history_df["Timestamp"] - NEWS_WINDOW < news_df["Timestamp"].min()).sum())
+
+
+def run_backfill(news_source="firestore", workers=None, batch_size=DEFAULT_BATCH_SIZE, apply=False):
+    os.makedirs(BACKFILL_FOLDER, exist_ok=True)
+
+    history_df = load_risk_history()
+    news_df = load_news_history(news_source)
+    logging.info(f"Loaded {len(history_df)} risk rows and {len(news_df)} headlines ({news_source}).")
+    uncovered = uncovered_rows(history_df, news_df)
+    if uncovered:
+        # daily_news_scan.csv keeps only the newest 100 headlines; newsHistory keeps them all.
+        first = news_df["Timestamp"].min() if not news_df.empty else "none"
+        logging.warning(f"⚠️ Headlines ({news_source}) start at {first}: News_Risk of {uncovered}/{len(history_df)} "
+                        f"risk rows is only re-scored for the headlines after that.")
+
+    if news_df.empty:
+        rescored_news = news_df.assign(New_Risk=[], New_Sector=[], Delta=[])
+    else:
+        rescored_news = rescore_headlines(news_df, workers=workers, batch_size=batch_size)
+    rescored_history = rescore_history(history_df, rescored_news)
+    history_diff = build_history_diff(history_df, rescored_history)
+
+    out_history = rescored_history.drop(columns=["Source_Line"])
+    out_history["Timestamp"] = out_history["Timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    out_history.to_csv(RESCORED_HISTORY_FILE, index=False)
+    history_diff.to_csv(HISTORY_DIFF_FILE, index=False)
+    rescored_news[rescored_news["Delta"] != 0].to_csv(NEWS_DIFF_FILE, index=False)
+
+    logging.info(
+        f"✅ BACKFILL COMPLETE. {len(history_diff)}/{len(history_df)} risk rows and "
+        f"{int((rescored_news['Delta'] != 0).sum())}/{len(rescored_news)} headlines changed. "
+        f"Diff written to {HISTORY_DIFF_FILE}"
+    )
+
+    if apply:
+        apply_rescored_history(rescored_history)
+        logging.info(f"Rewrote the risk columns of {scraper.RISK_HISTORY_FILE} with re-scored values.")
+
+    return history_diff
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-score stored headlines and risk history with the current model")
+    arg_parser.add_argument("--news-source", choices=["csv", "firestore"], default="firestore",
+                            help="Headlines from the Firestore newsHistory collection (every headline) or "
+                                 "daily_news_scan.csv (only the newest 100).")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    arg_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    arg_parser.add_argument("--apply", action="store_true", help="Write the re-scored risk columns back into risk_history.csv.")
+    args = arg_parser.parse_args()
+    run_backfill(args.news_source, args.workers, args.batch_size, args.apply)
@@ -1,9 +1,12 @@
+import argparse
 import pandas as pd
 import datetime
 import logging
 import os
 import json
 
+import metrics
+
 
 try:
     import firebase_admin
@@ -139,9 +142,21 @@ def migrate_news_history(db):
 def run_migrator():
     db = initialize_firestore()
     if db:
-        migrate_risk_history(db)
-        migrate_news_history(db)
+        with metrics.stage("migrate_risk_history"):
+            migrate_risk_history(db)
+        with metrics.stage("migrate_news_history"):
+            migrate_news_history(db)
         logging.info("🎉 All data migration tasks finished.")
 
 if __name__ == "__main__":
-    run_migrator()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="Vita.lk CSV to Firestore migrator")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="Run under cProfile/tracemalloc and write reports to the profile directory.")
+    arg_parser.add_argument("--profile-dir", default=os.path.join(DATA_FOLDER, "profiles"),
+                            help="Where --profile writes its reports.")
+    args = arg_parser.parse_args()
+    if args.profile:
+        import profiler
+        profiler.profile_run(run_migrator, "migrator", args.profile_dir)
+    else:
+        run_migrator()
\ No newline at end of file
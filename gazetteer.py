@@ -0,0 +1,163 @@
+import re
+
+
+# District -> (province, names that place a headline in it). Names are lowercase as they
+# appear in English-language Sri Lankan news; the district name itself is always included.
+DISTRICTS = {
+    "Colombo": ("Western", [
+        "dehiwala", "mount lavinia", "moratuwa", "kotte", "sri jayawardenepura", "battaramulla",
+        "maharagama", "homagama", "kaduwela", "kolonnawa", "avissawella", "padukka", "hanwella",
+        "borella", "wellawatte", "bambalapitiya", "kollupitiya", "pettah", "maradana", "dematagoda",
+        "grandpass", "mattakkuliya", "kotahena", "slave island", "kirulapone", "nugegoda",
+        "piliyandala", "kesbewa", "boralesgamuwa", "malabe", "galle face", "beira lake", "port city",
+    ]),
+    "Gampaha": ("Western", [
+        "negombo", "katunayake", "bandaranaike international airport", "ja-ela", "wattala", "kelaniya",
+        "ragama", "kadawatha", "minuwangoda", "divulapitiya", "mirigama", "veyangoda", "nittambuwa",
+        "kiribathgoda", "biyagama", "kerawalapitiya", "dompe", "attanagalla", "peliyagoda",
+    ]),
+    "Kalutara": ("Western", [
+        "panadura", "horana", "beruwala", "aluthgama", "matugama", "agalawatta", "bulathsinhala",
+        "ingiriya", "bandaragama", "wadduwa",
+    ]),
+    "Kandy": ("Central", [
+        "peradeniya", "katugastota", "gampola", "nawalapitiya", "kundasale", "digana", "akurana",
+        "pilimatalawa", "kadugannawa", "teldeniya", "victoria reservoir", "dalada maligawa",
+        "temple of the tooth",
+    ]),
+    "Matale": ("Central", ["dambulla", "sigiriya", "galewela", "rattota", "naula", "ukuwela"]),
+    "Nuwara Eliya": ("Central", [
+        "hatton", "talawakele", "nanu oya", "maskeliya", "ginigathhena", "ragala", "walapane",
+        "kotmale", "horton plains",
+    ]),
+    "Galle": ("Southern", [
+        "hikkaduwa", "ambalangoda", "elpitiya", "bentota", "baddegama", "karapitiya", "unawatuna",
+        "koggala", "habaraduwa", "balapitiya",
+    ]),
+    "Matara": ("Southern", [
+        "weligama", "dikwella", "akuressa", "hakmana", "deniyaya", "kamburupitiya", "mirissa",
+        "devinuwara", "dondra",
+    ]),
+    "Hambantota": ("Southern", [
+        "tangalle", "tissamaharama", "ambalantota", "beliatta", "weeraketiya", "mattala", "yala",
+        "suriyawewa",
+    ]),
+    "Jaffna": ("Northern", [
+        "point pedro", "chavakachcheri", "kankesanthurai", "nallur", "valvettithurai", "karainagar",
+        "kayts", "palaly",
+    ]),
+    "Kilinochchi": ("Northern", ["paranthan", "pooneryn", "elephant pass"]),
+    "Mannar": ("Northern", ["talaimannar", "madhu", "murunkan", "pesalai"]),
+    "Vavuniya": ("Northern", ["cheddikulam", "nedunkerny"]),
+    "Mullaitivu": ("Northern", ["puthukudiyiruppu", "oddusuddan", "mankulam"]),
+    "Batticaloa": ("Eastern", [
+        "kattankudy", "eravur", "valaichchenai", "kaluwanchikudy", "pasikudah", "chenkalady",
+    ]),
+    "Ampara": ("Eastern", [
+        "kalmunai", "akkaraipattu", "sainthamaruthu", "pottuvil", "arugam bay", "sammanthurai",
+        "dehiattakandiya", "uhana",
+    ]),
+    "Trincomalee": ("Eastern", [
+        "kinniya", "muttur", "kantale", "seruwila", "nilaveli", "china bay", "sampur", "kuchchaveli",
+    ]),
+    "Kurunegala": ("North Western", [
+        "kuliyapitiya", "narammala", "pannala", "polgahawela", "wariyapola", "nikaweratiya", "maho",
+        "giriulla", "alawwa", "ibbagamuwa",
+    ]),
+    "Puttalam": ("North Western", [
+        "chilaw", "wennappuwa", "marawila", "nattandiya", "anamaduwa", "kalpitiya", "norochcholai",
+        "lakvijaya", "dankotuwa", "mundel",
+    ]),
+    "Anuradhapura": ("North Central", [
+        "kekirawa", "medawachchiya", "eppawala", "tambuttegama", "thambuttegama", "mihintale",
+        "kebithigollewa", "horowpothana", "galenbindunuwewa", "padaviya", "nochchiyagama",
+    ]),
+    "Polonnaruwa": ("North Central", [
+        "kaduruwela", "hingurakgoda", "medirigiriya", "minneriya", "dimbulagala", "manampitiya",
+        "welikanda", "aralaganwila",
+    ]),
+    "Badulla": ("Uva", [
+        "bandarawela", "haputale", "ella", "welimada", "mahiyanganaya", "passara", "hali-ela",
+        "diyatalawa", "lunugala", "meeriyabedda", "koslanda",
+    ]),
+    "Monaragala": ("Uva", [
+        "moneragala", "wellawaya", "buttala", "bibile", "kataragama", "siyambalanduwa",
+        "thanamalwila", "medagama",
+    ]),
+    "Ratnapura": ("Sabaragamuwa", [
+        "balangoda", "embilipitiya", "pelmadulla", "eheliyagoda", "kuruwita", "kahawatta",
+        "godakawela", "kalawana", "rakwana", "sri pada", "adam's peak", "udawalawe", "samanalawewa",
+    ]),
+    "Kegalle": ("Sabaragamuwa", [
+        "mawanella", "rambukkana", "warakapola", "ruwanwella", "yatiyantota", "dehiowita",
+        "deraniyagala", "aranayake", "pinnawala", "bulathkohupitiya",
+    ]),
+}
+
+# Names spanning several districts.
+SHARED_NAMES = {
+    "kelani river": ("Colombo", "Gampaha"),
+    "kelani ganga": ("Colombo", "Gampaha"),
+    "mahaweli": ("Kandy", "Polonnaruwa", "Trincomalee"),
+    "jaffna peninsula": ("Jaffna",),
+}
+
+# Phrases that contain a place name but do not place the story there. They are matched like
+# any other name (longest wins) and resolve to no district.
+NOT_PLACES = ["hatton national bank", "ceylon", "galle road"]
+
+PROVINCES = {district: province for district, (province, _) in DISTRICTS.items()}
+
+
+def _build_index():
+    index = {}
+    for district, (_, names) in DISTRICTS.items():
+        for name in [district.lower()] + names:
+            index.setdefault(name, ())
+            index[name] = tuple(dict.fromkeys(index[name] + (district,)))
+    index.update(SHARED_NAMES)
+    for phrase in NOT_PLACES:
+        index[phrase] = ()
+    return index
+
+
+def _trie_pattern(words):
+    """
+    One regex for every name, factored into a character trie ("galle(?: face)?"), so the
+    engine walks shared prefixes once instead of trying each name in turn. Optional suffixes
+    are greedy, so the longest name at a position wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(r"\b" + emit(trie) + r"\b")
+
+
+NAME_INDEX = _build_index()
+NAME_PATTERN = _trie_pattern(NAME_INDEX)
+
+
+def locate(text):
+    """Districts mentioned in lowercase `text`, in order of first mention."""
+    found = {}
+    for match in NAME_PATTERN.finditer(text):
+        for district in NAME_INDEX.get(match.group(0), ()):
+            found.setdefault(district, None)
+    return tuple(found)
+
+
+def district_of(place):
+    """District for a single place name (e.g. a weather city), or None."""
+    districts = locate(place.lower())
+    return districts[0] if districts else None
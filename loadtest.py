@@ -0,0 +1,371 @@
+import argparse
+import csv
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from streamlit.testing.v1 import AppTest
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(REPO_DIR, "data")
+RISK_HISTORY_FILE = os.path.join(DATA_FOLDER, "risk_history.csv")
+NEWS_LOG_FILE = os.path.join(DATA_FOLDER, "daily_news_scan.csv")
+LOADTEST_REPORT_FILE = os.path.join(DATA_FOLDER, "loadtest_report.json")
+
+CANVAS_APP_ID = "sl_risk_monitor"
+CANVAS_USER_ID = "backend_service_user"
+ROOT = f"artifacts/{CANVAS_APP_ID}/users/{CANVAS_USER_ID}"
+
+APP_TIMEOUT = 60
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ReadCounter:
+    """Thread-safe tally of Firestore document reads, split by operation."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, kind, n=1):
+        with self.lock:
+            self.counts[kind] = self.counts.get(kind, 0) + n
+
+    def total(self):
+        with self.lock:
+            return sum(self.counts.values())
+
+
+# In-process Firestore stand-in: just the calls app.py makes, billed like Firestore
+# (one read per document returned, at least one per query or lookup).
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeQuery:
+    def __init__(self, store, path, counter, filters=(), orders=(), cursor=None, limit_to=None):
+        self.store, self.path, self.counter = store, path, counter
+        self.filters, self.orders, self.cursor, self.limit_to = list(filters), list(orders), cursor, limit_to
+
+    def _copy(self, **changes):
+        fields = {"filters": self.filters, "orders": self.orders, "cursor": self.cursor, "limit_to": self.limit_to}
+        fields.update(changes)
+        return FakeQuery(self.store, self.path, self.counter, **fields)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self.filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self.orders + [(field_path, direction)])
+
+    def start_after(self, values):
+        return self._copy(cursor=list(values))
+
+    def limit(self, count):
+        return self._copy(limit_to=count)
+
+    def stream(self):
+        ops = {"==": lambda a, b: a == b, ">=": lambda a, b: a >= b, ">": lambda a, b: a > b,
+               "<=": lambda a, b: a <= b, "<": lambda a, b: a < b}
+        prefix = self.path + "/"
+        rows = []
+        for doc_path, data in list(self.store.items()):
+            doc_id = doc_path[len(prefix):]
+            if not doc_path.startswith(prefix) or "/" in doc_id:
+                continue
+            if all(field in data and ops[op](data[field], value) for field, op, value in self.filters):
+                rows.append((doc_id, data))
+
+        def key(row):
+            doc_id, data = row
+            return [doc_id if field == "__name__" else data.get(field) for field, _ in self.orders]
+
+        for index in reversed(range(len(self.orders))):
+            rows.sort(key=lambda row: key(row)[index], reverse=self.orders[index][1] == "DESCENDING")
+        if self.cursor is not None:
+            def after_cursor(row):
+                for value, cursor_value, (_, direction) in zip(key(row), self.cursor, self.orders):
+                    if value != cursor_value:
+                        return value < cursor_value if direction == "DESCENDING" else value > cursor_value
+                return False
+            rows = [row for row in rows if after_cursor(row)]
+        if self.limit_to is not None:
+            rows = rows[:self.limit_to]
+
+        self.counter.add("query", max(1, len(rows)))
+        return iter([FakeSnapshot(doc_id, dict(data)) for doc_id, data in rows])
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return FakeDocument(self.store, f"{self.path}/{doc_id}", self.counter)
+
+
+class FakeDocument:
+    def __init__(self, store, path, counter):
+        self.store, self.path, self.counter = store, path, counter
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name):
+        return FakeCollection(self.store, f"{self.path}/{name}", self.counter)
+
+    def get(self):
+        self.counter.add("get")
+        return FakeSnapshot(self.id, self.store.get(self.path))
+
+    def set(self, data, merge=False):
+        self.store[self.path] = {**self.store.get(self.path, {}), **data} if merge else dict(data)
+
+
+class FakeFirestore:
+    def __init__(self, counter):
+        self.store = {}
+        self.counter = counter
+
+    def collection(self, path):
+        return FakeCollection(self.store, path, self.counter)
+
+    def document(self, path):
+        return FakeDocument(self.store, path, self.counter)
+
+
+class CountingProxy:
+    """Wraps a real (emulator) client and counts the documents every get()/stream() returns."""
+
+    def __init__(self, target, counter):
+        self._target = target
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if name == "stream":
+                docs = list(result)
+                self._counter.add("query", max(1, len(docs)))
+                return iter(docs)
+            if name == "get" and hasattr(result, "exists"):
+                self._counter.add("get")
+                return result
+            if hasattr(result, "stream") or hasattr(result, "collection"):
+                return CountingProxy(result, self._counter)
+            return result
+        return call
+
+
+def read_csv_rows(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def seed_firestore(db):
+    """Loads the repo's CSVs into the same documents the scraper publishes."""
+    news = read_csv_rows(NEWS_LOG_FILE)
+    for row in news:
+        row["Risk"] = int(float(row.get("Risk") or 0))
+    history = read_csv_rows(RISK_HISTORY_FILE)
+    latest = dict(history[-1]) if history else {"Timestamp": "N/A"}
+    for field in ["Total_Risk", "News_Risk", "Economic_Risk", "Environmental_Risk", "Social_Risk", "Momentum"]:
+        latest[field] = int(float(latest.get(field) or 0))
+    for field in ["USD", "Oil_Price"]:
+        latest[field] = float(latest.get(field) or 0)
+    latest["Headlines"] = news
+
+    db.document(f"{ROOT}/riskData/latest").set(latest)
+    for index, row in enumerate(news):
+        db.collection(f"{ROOT}/newsHistory").document(f"seed_{index:05d}").set(row)
+
+
+def install_firebase_stub(client):
+    """app.py imports firebase_admin itself; hand it a module whose client() is ours."""
+    firebase_admin = types.ModuleType("firebase_admin")
+    firebase_admin._apps = {"[DEFAULT]": object()}
+    firestore_module = types.ModuleType("firebase_admin.firestore")
+    firestore_module.client = lambda: client
+    credentials_module = types.ModuleType("firebase_admin.credentials")
+    firebase_admin.firestore = firestore_module
+    firebase_admin.credentials = credentials_module
+    sys.modules.update({
+        "firebase_admin": firebase_admin,
+        "firebase_admin.firestore": firestore_module,
+        "firebase_admin.credentials": credentials_module,
+    })
+
+
+class CountingFileHandler(SimpleHTTPRequestHandler):
+    """Serves the repo like raw.githubusercontent.com and counts the requests."""
+
+    requests_served = 0
+    lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=REPO_DIR, **kwargs)
+
+    def do_GET(self):
+        with CountingFileHandler.lock:
+            CountingFileHandler.requests_served += 1
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_csv_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingFileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def flip_chart_source(app):
+    radio = app.sidebar.radio[0]
+    radio.set_value(radio.options[(radio.options.index(radio.value) + 1) % len(radio.options)])
+
+
+def run_loadtest(sessions, reruns, think_seconds=0.0, emulator=False):
+    """
+    Opens `sessions` dashboard sessions and reruns each of them `reruns` times. AppTest keeps
+    one Streamlit runtime per process, so sessions are interleaved round-robin like viewers
+    sharing one server; they share its st.cache_* caches just as real sessions do.
+    """
+    counter = ReadCounter()
+    if emulator:
+        from google.cloud import firestore
+        client = CountingProxy(firestore.Client(project=os.environ.get("GCLOUD_PROJECT", "vita-loadtest")), counter)
+    else:
+        client = FakeFirestore(counter)
+    seed_firestore(client._target if emulator else client)
+    install_firebase_stub(client)
+
+    server, base_url = start_csv_server()
+    os.environ["VITA_BASE_URL"] = base_url
+    logging.info(f"Load test: {sessions} sessions x {reruns} reruns "
+                 f"({'emulator' if emulator else 'in-process fake'} Firestore, CSVs from {base_url})")
+
+    tracemalloc.start()
+    baseline_memory, _ = tracemalloc.get_traced_memory()
+    apps = [AppTest.from_file(os.path.join(REPO_DIR, "app.py"), default_timeout=APP_TIMEOUT) for _ in range(sessions)]
+    first_loads, rerun_times = [], []
+    session_reads = [0] * sessions
+
+    started = time.perf_counter()
+    for step in range(reruns + 1):
+        for index, app in enumerate(apps):
+            # Every third rerun the viewer switches chart source, like a user would.
+            if step and step % 3 == 0 and app.sidebar.radio:
+                flip_chart_source(app)
+            reads_before = counter.total()
+            run_started = time.perf_counter()
+            app.run()
+            (rerun_times if step else first_loads).append(time.perf_counter() - run_started)
+            session_reads[index] += counter.total() - reads_before
+        if think_seconds:
+            time.sleep(think_seconds)
+    wall = time.perf_counter() - started
+    # Apps are still alive here, so this is what the sessions' state and caches hold.
+    retained_memory, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    server.shutdown()
+
+    total_runs = sessions * (reruns + 1)
+    report = {
+        "sessions": sessions,
+        "reruns_per_session": reruns,
+        "think_seconds": think_seconds,
+        "backend": "emulator" if emulator else "fake",
+        "wall_seconds": round(wall, 3),
+        "first_load_ms": {"p50": round(percentile(first_loads, 50) * 1000, 1),
+                          "p95": round(percentile(first_loads, 95) * 1000, 1)},
+        "rerun_ms": {"p50": round(percentile(rerun_times, 50) * 1000, 1),
+                     "p95": round(percentile(rerun_times, 95) * 1000, 1),
+                     "max": round(max(rerun_times, default=0) * 1000, 1),
+                     "mean": round(statistics.fmean(rerun_times) * 1000, 1) if rerun_times else 0.0},
+        "firestore_reads": {"total": counter.total(), "per_run": round(counter.total() / total_runs, 3),
+                            "per_session_max": max(session_reads, default=0),
+                            "by_operation": dict(counter.counts)},
+        "csv_requests": {"total": CountingFileHandler.requests_served,
+                         "per_run": round(CountingFileHandler.requests_served / total_runs, 3)},
+        "memory_mib": {"per_session": round((retained_memory - baseline_memory) / sessions / 2**20, 3),
+                       "peak": round(peak_memory / 2**20, 2)},
+        "errors": sorted({str(e.value)[:200] for app in apps for e in app.exception}),
+    }
+    return report
+
+
+def print_report(report, baseline=None):
+    def line(label, path, unit):
+        value = report
+        base = baseline
+        for key in path:
+            value = value[key]
+            base = base.get(key) if isinstance(base, dict) else None
+        delta = f"  (baseline {base}{unit}, {value - base:+.1f})" if isinstance(base, (int, float)) else ""
+        print(f"   {label:<28}{value}{unit}{delta}")
+
+    print(f"\n🧪 Dashboard load test: {report['sessions']} sessions, {report['reruns_per_session']} reruns each "
+          f"[{report['backend']}] in {report['wall_seconds']}s")
+    line("First load p50", ["first_load_ms", "p50"], " ms")
+    line("First load p95", ["first_load_ms", "p95"], " ms")
+    line("Rerun p50", ["rerun_ms", "p50"], " ms")
+    line("Rerun p95", ["rerun_ms", "p95"], " ms")
+    line("Firestore reads / run", ["firestore_reads", "per_run"], "")
+    line("CSV requests / run", ["csv_requests", "per_run"], "")
+    line("Memory / session", ["memory_mib", "per_session"], " MiB")
+    line("Peak traced memory", ["memory_mib", "peak"], " MiB")
+    for error in report["errors"]:
+        print(f"   ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Drive many headless dashboard sessions against a Firestore stand-in")
+    arg_parser.add_argument("--sessions", type=int, default=24)
+    arg_parser.add_argument("--reruns", type=int, default=5)
+    arg_parser.add_argument("--think", type=float, default=0.0,
+                            help="Seconds between rerun rounds, so cache TTLs can expire as they would live.")
+    arg_parser.add_argument("--emulator", action="store_true",
+                            help="Use the Firestore emulator at FIRESTORE_EMULATOR_HOST instead of the in-process fake.")
+    arg_parser.add_argument("--baseline", default=None, help="Earlier report to compare against.")
+    arg_parser.add_argument("--output", default=LOADTEST_REPORT_FILE)
+    args = arg_parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    report = run_loadtest(args.sessions, args.reruns, args.think, args.emulator)
+    print_report(report, baseline)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Load test report written to {args.output}")
@@ -0,0 +1,152 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+DATA_FOLDER = "data"
+METRICS_LOG_FILE = os.path.join(DATA_FOLDER, "scan_metrics.jsonl")
+METRICS_PROM_FILE = os.path.join(DATA_FOLDER, "scan_metrics.prom")
+
+# Set VITA_METRICS_PROMETHEUS=1 to also write a node_exporter textfile.
+PROMETHEUS_ENABLED = os.environ.get("VITA_METRICS_PROMETHEUS", "0") == "1"
+
+METRIC_PREFIX = "vita_scan"
+
+
+_LOCK = threading.Lock()
+_RUN = {}
+
+# Stage stacks keyed by thread id, so a sampling profiler can see what other threads are doing.
+_STAGE_STACKS = {}
+
+
+def start_run():
+    """Resets the per-run timers and counters."""
+    with _LOCK:
+        _RUN.clear()
+        _RUN.update({
+            "started_at": time.time(),
+            "timers": {},
+            "labelled": {},
+            "counters": {},
+        })
+
+
+def _record_time(name, label, elapsed):
+    with _LOCK:
+        if not _RUN:
+            return
+        total, calls = _RUN["timers"].get(name, (0.0, 0))
+        _RUN["timers"][name] = (total + elapsed, calls + 1)
+        if label is not None:
+            per_label = _RUN["labelled"].setdefault(name, {})
+            per_label[label] = per_label.get(label, 0.0) + elapsed
+
+
+@contextmanager
+def stage(name, label=None):
+    """Times a block of the scan. `label` splits a stage per source (e.g. feed URL)."""
+    stack = _STAGE_STACKS.setdefault(threading.get_ident(), [])
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_time(name, label, time.perf_counter() - start)
+        stack.pop()
+
+
+def current_stage(thread_id=None):
+    """Innermost stage active on the given thread (default: the caller), or None."""
+    stack = _STAGE_STACKS.get(thread_id if thread_id is not None else threading.get_ident())
+    return stack[-1] if stack else None
+
+
+def incr(name, amount=1):
+    with _LOCK:
+        if not _RUN:
+            return
+        _RUN["counters"][name] = _RUN["counters"].get(name, 0) + amount
+
+
+def snapshot():
+    """Returns the current run's metrics as a JSON-serialisable dict."""
+    with _LOCK:
+        if not _RUN:
+            return {}
+        return {
+            "run_started": datetime.datetime.fromtimestamp(_RUN["started_at"]).isoformat(timespec="seconds"),
+            "wall_seconds": round(time.time() - _RUN["started_at"], 4),
+            "stages": {
+                name: {"seconds": round(total, 4), "calls": calls}
+                for name, (total, calls) in _RUN["timers"].items()
+            },
+            "per_source": {
+                name: {label: round(secs, 4) for label, secs in labels.items()}
+                for name, labels in _RUN["labelled"].items()
+            },
+            "counters": dict(_RUN["counters"]),
+        }
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(snap):
+    """Formats a metrics snapshot in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_PREFIX}_wall_seconds Wall-clock duration of the last scan run.",
+        f"# TYPE {METRIC_PREFIX}_wall_seconds gauge",
+        f"{METRIC_PREFIX}_wall_seconds {snap.get('wall_seconds', 0)}",
+        f"# HELP {METRIC_PREFIX}_stage_seconds Time spent per scan stage in the last run.",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+    ]
+    for name, values in snap.get("stages", {}).items():
+        lines.append(f'{METRIC_PREFIX}_stage_seconds{{stage="{_escape_label(name)}"}} {values["seconds"]}')
+    for name, labels in snap.get("per_source", {}).items():
+        for label, secs in labels.items():
+            lines.append(
+                f'{METRIC_PREFIX}_stage_seconds{{stage="{_escape_label(name)}",source="{_escape_label(label)}"}} {secs}'
+            )
+
+    lines.append(f"# HELP {METRIC_PREFIX}_stage_calls Number of times each stage ran in the last run.")
+    lines.append(f"# TYPE {METRIC_PREFIX}_stage_calls gauge")
+    for name, values in snap.get("stages", {}).items():
+        lines.append(f'{METRIC_PREFIX}_stage_calls{{stage="{_escape_label(name)}"}} {values["calls"]}')
+
+    lines.append(f"# HELP {METRIC_PREFIX}_events Per-run event counters (entries kept, filtered, cached...).")
+    lines.append(f"# TYPE {METRIC_PREFIX}_events gauge")
+    for name, value in snap.get("counters", {}).items():
+        lines.append(f'{METRIC_PREFIX}_events{{event="{_escape_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_run_metrics(extra=None):
+    """Appends one JSON line for this run and refreshes the Prometheus textfile if enabled."""
+    snap = snapshot()
+    if not snap:
+        return snap
+    if extra:
+        snap.update(extra)
+
+    try:
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+        with open(METRICS_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snap, default=str) + "\n")
+
+        if PROMETHEUS_ENABLED:
+            # Write-then-rename so a scraping exporter never sees a half-written file.
+            tmp_path = METRICS_PROM_FILE + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(render_prometheus(snap))
+            os.replace(tmp_path, METRICS_PROM_FILE)
+    except Exception as e:
+        logging.error(f"Metrics write failed: {e}")
+
+    return snap
@@ -0,0 +1,172 @@
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import metrics
+
+
+PROFILE_DIR = os.path.join("data", "profiles")
+
+SAMPLE_INTERVAL = 0.005
+TOP_HOTSPOTS = 60
+TOP_ALLOCATIONS = 40
+TRACEMALLOC_FRAMES = 25
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's Python stack and buckets the samples by metrics stage."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name="vita-stack-sampler", daemon=True)
+        self.interval = interval
+        self.samples = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stage = metrics.current_stage(thread_id) or "unstaged"
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                folded = ";".join(reversed(stack))
+                self.samples.setdefault(stage, Counter())[folded] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ThreadedProfile:
+    """
+    cProfile for the calling thread and for every thread started while enabled (the scan's
+    executor workers), merged into one report. A plain cProfile.Profile before Python 3.12
+    only sees the thread that enabled it, which here is mostly waiting on futures.
+    """
+
+    def __init__(self):
+        self.profiles = [cProfile.Profile()]
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, frame, event, arg):
+        # Installed by threading.setprofile; runs once in each new thread, then cProfile takes over.
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def enable(self):
+        if sys.version_info < (3, 12):  # 3.12+ profiles every thread through sys.monitoring
+            threading.setprofile(self._profile_thread)
+        self.profiles[0].enable()
+
+    def disable(self):
+        self.profiles[0].disable()
+        threading.setprofile(None)
+
+    def stats(self, stream=None):
+        with self._lock:
+            profiles = list(self.profiles)
+        merged = None
+        for profile in profiles:
+            try:
+                if merged is None:
+                    merged = pstats.Stats(profile, stream=stream)
+                else:
+                    merged.add(profile)
+            except TypeError:  # a thread that made no profiled calls
+                continue
+        return merged
+
+
+def _write_hotspots(stats, path):
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.strip_dirs()
+    stream.write("=== Sorted by cumulative time ===\n")
+    stats.sort_stats("cumulative").print_stats(TOP_HOTSPOTS)
+    stream.write("\n=== Sorted by internal time ===\n")
+    stats.sort_stats("tottime").print_stats(TOP_HOTSPOTS)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(stream.getvalue())
+
+
+def _write_allocations(snapshot, path):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("=== Top allocations by line ===\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+        f.write("\n=== Top allocation tracebacks ===\n")
+        for stat in snapshot.statistics("traceback")[:10]:
+            f.write(f"\n{stat.count} blocks, {stat.size / 1024:.1f} KiB\n")
+            for line in stat.traceback.format():
+                f.write(f"{line}\n")
+
+
+def _write_stacks(sampler, run_dir):
+    """One flamegraph.pl / speedscope compatible folded-stack file per stage."""
+    combined = Counter()
+    for stage, stacks in sampler.samples.items():
+        safe_stage = "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+        with open(os.path.join(run_dir, f"stacks_{safe_stage}.folded"), "w", encoding="utf-8") as f:
+            for folded, count in stacks.most_common():
+                f.write(f"{folded} {count}\n")
+        for folded, count in stacks.items():
+            combined[f"{stage};{folded}"] += count
+
+    with open(os.path.join(run_dir, "stacks_all.folded"), "w", encoding="utf-8") as f:
+        for folded, count in combined.most_common():
+            f.write(f"{folded} {count}\n")
+
+
+def profile_run(func, label, profile_dir=PROFILE_DIR):
+    """
+    Runs `func` under cProfile (every thread it starts included), tracemalloc and the stack
+    sampler, then writes the reports.
+    """
+    run_dir = os.path.join(profile_dir, f"{label}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(run_dir, exist_ok=True)
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    sampler = StackSampler()
+    profile = ThreadedProfile()
+
+    sampler.start()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        return func()
+    finally:
+        profile.disable()
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        try:
+            stats = profile.stats()
+            stats.dump_stats(os.path.join(run_dir, "run.prof"))
+            _write_hotspots(stats, os.path.join(run_dir, "hotspots.txt"))
+            _write_allocations(snapshot, os.path.join(run_dir, "allocations.txt"))
+            _write_stacks(sampler, run_dir)
+            logging.info(f"🔬 Profile written to {run_dir} ({elapsed:.2f}s, peak traced memory {peak / 1024 / 1024:.1f} MiB)")
+        except Exception as e:
+            logging.error(f"Profile report failed: {e}")
@@ -1,15 +1,33 @@
+import argparse
+import calendar
 import feedparser
 import pandas as pd
 import datetime
+import json
 import logging
 import os
 import pytz
+import sys
+import threading
 import yfinance as yf
-import requests
 import difflib
+import hashlib
 import time
 from dateutil import parser
 from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed, wait
+from functools import lru_cache
+from html.parser import HTMLParser
+
+import gazetteer
+import metrics
+import transport
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic but are not serialised between processes.
+    fcntl = None
 
 
 try:
@@ -52,17 +70,35 @@ DATA_FOLDER = "data"
 RISK_HISTORY_FILE = os.path.join(DATA_FOLDER, "risk_history.csv")
 MARKET_DATA_FILE = os.path.join(DATA_FOLDER, "market_data.csv")
 NEWS_LOG_FILE = os.path.join(DATA_FOLDER, "daily_news_scan.csv")
+DISTRICT_RISK_FILE = os.path.join(DATA_FOLDER, "district_risk.csv")
 
 
 WEATHER_API_KEY = ""
 
 DEMO_MODE = False 
 
+# Optional full-text enrichment: scores feed summaries / article bodies as well as titles.
+# Turn on with VITA_ENRICH=1 or --enrich.
+ENRICH_ARTICLES = os.environ.get("VITA_ENRICH", "0") == "1"
+ENRICH_FETCH_BODIES = True
+ENRICH_MAX_WORKERS = 6
+ENRICH_MAX_ARTICLES = 40
+ENRICH_MAX_BYTES = 256 * 1024
+ENRICH_MAX_WORDS = 150
+ENRICH_MIN_SUMMARY_WORDS = 25
+ENRICH_FETCH_TIMEOUT = 4
+ENRICH_TOTAL_BUDGET = 8
+ENRICH_CACHE_LIMIT = 5000
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 SL_TIMEZONE = pytz.timezone('Asia/Colombo')
 
 
 _CACHE_STORE = {}
+_ENRICH_URL_CACHE = {}
+_ENRICH_PARSE_CACHE = {}
+# Feed ordering for scans without a NewsWindow (sharded runs); only lasts as long as the process.
+_FEED_ORDERING = {}
 
 def is_cache_valid(key, ttl_seconds):
     """Checks if data in cache is fresh."""
@@ -284,83 +320,243 @@ IGNORE_KEYWORDS = [
 
 
 
-def get_market_data():
-    
-    CACHE_KEY = "market_data"
-    TTL = 60 
+WEATHER_CITIES = ["Colombo", "Kandy", "Galle", "Jaffna", "Trincomalee", "Ratnapura", "Anuradhapura", "Batticaloa"]
 
-    if is_cache_valid(CACHE_KEY, TTL):
-        logging.info("⚡ Using Cached Market Data")
-        return get_from_cache(CACHE_KEY)
+RISK_WEIGHTS = {"eco": 0.35, "news": 0.30, "social": 0.20, "env": 0.15}
+
+# How many of each feed's newest entries are considered, and how far back they may be published.
+FEED_ENTRY_WINDOW = 10
+NEWS_WINDOW_HOURS = 6
+
+
+# A scan profile bundles everything that is specific to one region or client.
+# Extra profiles can be defined in data/scan_profiles.json; omitted fields inherit from the default.
+DEFAULT_PROFILE = "sri_lanka"
+PROFILES_FILE = os.path.join(DATA_FOLDER, "scan_profiles.json")
+PROFILES = {
+    DEFAULT_PROFILE: {
+        "name": DEFAULT_PROFILE,
+        "feeds": RSS_FEEDS,
+        "risk_keywords": RISK_KEYWORDS,
+        "ignore_keywords": IGNORE_KEYWORDS,
+        "currency_ticker": "LKR=X",
+        "oil_ticker": "BZ=F",
+        "usd_baseline": 290,
+        "locations": WEATHER_CITIES,
+        "weights": RISK_WEIGHTS,
+        "search_suffix": "Sri Lanka News",
+        "entry_window": FEED_ENTRY_WINDOW,
+        "news_window_hours": NEWS_WINDOW_HOURS,
+        # Tag headlines with Sri Lankan districts and score each district (see gazetteer.py).
+        "gazetteer": True,
+    }
+}
+ACTIVE_PROFILES = [p.strip() for p in os.environ.get("VITA_PROFILES", DEFAULT_PROFILE).split(",") if p.strip()]
+
+FEED_FETCH_WORKERS = 8
+
+# All outbound HTTP goes through transport.py's shared keep-alive session. Feeds are downloaded
+# there and parsed from bytes; these response headers are passed on to feedparser.
+FEED_HEADERS = ("content-type", "content-location", "content-language")
+YAHOO_HOST = "query2.finance.yahoo.com"
+
+# Market, weather and news are acquired concurrently; each source gets this long (seconds)
+# before run_scraper scores with its fallback. Feeds still downloading at FEED_FETCH_DEADLINE are dropped;
+# FEED_FETCH_TIMEOUT bounds each feed's connect and read.
+SOURCE_TIMEOUTS = {"market": 20, "weather": 20, "news": 75}
+FEED_FETCH_DEADLINE = 60
+FEED_FETCH_TIMEOUT = 15
+
+# Incremental news: each feed keeps a high-water mark (the GUID/link of every entry already
+# processed and the newest publish time), so only new entries are parsed and scored. The news
+# score is a windowed aggregate over data/news_window.json: new headlines are added and those
+# older than news_window_hours expire. Sharded runs always scan in full.
+INCREMENTAL_NEWS = True
+NEWS_WINDOW_FILE = os.path.join(DATA_FOLDER, "news_window.json")
+
+# Adaptive polling (needs INCREMENTAL_NEWS): each feed's publishing rate is learned from its entry
+# timestamps and the feed is polled about twice per average gap, within these bounds (seconds).
+# Feeds that are not due still count through the news window. An emerging-threat score at or
+# above EMERGING_SPIKE_SCORE polls every skipped feed immediately.
+ADAPTIVE_POLLING = True
+FEED_SCHEDULE_FILE = os.path.join(DATA_FOLDER, "feed_schedule.json")
+POLL_MIN_INTERVAL = 5 * 60
+POLL_MAX_INTERVAL = 2 * 3600
+POLL_GAP_FRACTION = 0.5
+POLL_EWMA_ALPHA = 0.3
+POLL_SLACK = 60
+EMERGING_SPIKE_SCORE = 30
+
+# Sharded mode: each worker writes data/shards/<run_id>/shard_<i>_of_<n>.json; --merge waits this
+# long (seconds) for every shard before scoring with whatever has arrived.
+SHARDS_FOLDER = os.path.join(DATA_FOLDER, "shards")
+SHARD_MERGE_WAIT = 120
+
+# Incremental sinks flush flagged headlines once this many are buffered or this many seconds pass.
+SINK_MAX_BATCH = 10
+SINK_MAX_DELAY = 3.0
+
+
+def load_profiles():
+    """Merges profiles from PROFILES_FILE over the built-in default."""
+    if not os.path.exists(PROFILES_FILE):
+        return PROFILES
+    try:
+        with open(PROFILES_FILE, encoding="utf-8") as f:
+            custom = json.load(f)
+    except Exception as e:
+        logging.error(f"Could not read {PROFILES_FILE}: {e}")
+        return PROFILES
+
+    profiles = dict(PROFILES)
+    for name, overrides in custom.items():
+        profiles[name] = {**PROFILES[DEFAULT_PROFILE], **overrides, "name": name}
+    return profiles
+
+
+def profile_files(profile):
+    """Data file paths for a profile. The default profile keeps the original data/ layout."""
+    if profile["name"] == DEFAULT_PROFILE:
+        return {"risk_history": RISK_HISTORY_FILE, "market_data": MARKET_DATA_FILE, "news_log": NEWS_LOG_FILE,
+                "district_risk": DISTRICT_RISK_FILE, "news_window": NEWS_WINDOW_FILE}
+    folder = os.path.join(DATA_FOLDER, profile["name"])
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    return {
+        "risk_history": os.path.join(folder, "risk_history.csv"),
+        "market_data": os.path.join(folder, "market_data.csv"),
+        "news_log": os.path.join(folder, "daily_news_scan.csv"),
+        "district_risk": os.path.join(folder, "district_risk.csv"),
+        "news_window": os.path.join(folder, "news_window.json"),
+    }
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on `path`.lock, so concurrent workers serialise read-modify-write."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write_csv(df, path):
+    """Write-then-rename, so readers never see a half-written CSV."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def atomic_write_json(payload, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def fetch_market_quotes(tickers):
+    """Latest close per Yahoo ticker, one batched request for every ticker not in cache."""
+    TTL = 60
+    quotes = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        if is_cache_valid(f"quote:{ticker}", TTL):
+            metrics.incr("cache_hit_market")
+            quotes[ticker] = get_from_cache(f"quote:{ticker}")
+        else:
+            missing.append(ticker)
+
+    if missing:
+        logging.info(f"Fetching Market Data ({' '.join(missing)})...")
+        try:
+            # yfinance keeps its own browser-impersonating session (Yahoo throttles plain
+            # clients); its latency still goes into the shared per-host stats.
+            with metrics.stage("market_fetch"), transport.track(YAHOO_HOST):
+                batch = yf.Tickers(" ".join(missing))
+                for ticker in missing:
+                    hist = batch.tickers[ticker].history(period="1d")
+                    quotes[ticker] = None if hist.empty else round(hist["Close"].iloc[-1], 2)
+        except Exception as e:
+            metrics.incr("market_errors")
+            logging.warning(f"Yahoo API Failed: {e}")
+        # Misses are cached too, so every profile falls back to its defaults without re-asking Yahoo.
+        for ticker in missing:
+            save_to_cache(f"quote:{ticker}", quotes.get(ticker))
+    return quotes
+
+
+def get_market_data(profile=None, quotes=None):
+    """USD and oil for a profile, from `quotes` ({ticker: price or None}) when already acquired."""
+    profile = profile or PROFILES[DEFAULT_PROFILE]
+    currency_ticker, oil_ticker = profile["currency_ticker"], profile["oil_ticker"]
 
-    logging.info("Fetching Market Data...")
-    
     market_data = {
         "usd_lkr": 300.00,
         "oil_price": 75.00,
         "source": "Hardcoded (Init)"
     }
 
-   
-    try:
-        tickers = yf.Tickers("LKR=X BZ=F")
-        usd_hist = tickers.tickers["LKR=X"].history(period="1d")
-        if not usd_hist.empty:
-            market_data["usd_lkr"] = round(usd_hist["Close"].iloc[-1], 2)
-            market_data["source"] = "Live (Yahoo)"
-        
-        oil_hist = tickers.tickers["BZ=F"].history(period="1d")
-        if not oil_hist.empty:
-            market_data["oil_price"] = round(oil_hist["Close"].iloc[-1], 2)
-        
-        logging.info(f"Market Data Success: USD {market_data['usd_lkr']} | Source: {market_data['source']}")
+    if quotes is None:
+        quotes = fetch_market_quotes([currency_ticker, oil_ticker])
+    if quotes.get(currency_ticker) is not None:
+        market_data["usd_lkr"] = quotes[currency_ticker]
+        market_data["source"] = "Live (Yahoo)"
+    if quotes.get(oil_ticker) is not None:
+        market_data["oil_price"] = quotes[oil_ticker]
+    logging.info(f"Market Data [{profile['name']}]: USD {market_data['usd_lkr']} | Source: {market_data['source']}")
 
-    except Exception as e:
-        logging.warning(f"Yahoo API Failed: {e}. Using {market_data['source']}")
+    with metrics.stage("csv_write", label="market_data"):
+        atomic_write_csv(pd.DataFrame([market_data]), profile_files(profile)["market_data"])
 
-    
-    pd.DataFrame([market_data]).to_csv(MARKET_DATA_FILE, index=False)
-    
-    
-    save_to_cache(CACHE_KEY, market_data)
-    
     return market_data
 
 
-def get_weather_data():
-   
-    CACHE_KEY = "weather_data"
-    TTL = 900 
-
-    if is_cache_valid(CACHE_KEY, TTL):
-        return get_from_cache(CACHE_KEY)
-
-    logging.info("Fetching Live Weather Data (WeatherAPI)...")
-    cities = ["Colombo", "Kandy", "Galle", "Jaffna", "Trincomalee", "Ratnapura", "Anuradhapura", "Batticaloa"]
-    max_rain_mm = 0.0
-    
-    try:
-        for city in cities:
+def fetch_weather_readings(cities):
+    """Current precipitation (mm) per city, cached per city so profiles share lookups."""
+    TTL = 900
+    readings = {}
+    fetched = False
+    for city in dict.fromkeys(cities):
+        if is_cache_valid(f"weather:{city}", TTL):
+            metrics.incr("cache_hit_weather")
+            readings[city] = get_from_cache(f"weather:{city}")
+            continue
+
+        if not fetched:
+            logging.info("Fetching Live Weather Data (WeatherAPI)...")
+            fetched = True
+        precip = 0.0
+        try:
             url = f"http://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={city}&aqi=no"
-            r = requests.get(url, timeout=2)
+            with metrics.stage("weather_fetch", label=city):
+                r = transport.get(url, timeout=2)
             if r.status_code == 200:
                 data = r.json()
                 precip = data.get('current', {}).get('precip_mm', 0.0)
-                if precip > max_rain_mm:
-                    max_rain_mm = precip
-    except Exception as e:
-        logging.error(f"Weather API Error: {e}")
-    
-    save_to_cache(CACHE_KEY, max_rain_mm)
-    return max_rain_mm
+        except Exception as e:
+            metrics.incr("weather_errors")
+            logging.error(f"Weather API Error ({city}): {e}")
+        save_to_cache(f"weather:{city}", precip)
+        readings[city] = precip
+    return readings
+
 
+def get_weather_data(cities=None):
+    """Heaviest current rainfall (mm) across a profile's locations."""
+    readings = fetch_weather_readings(cities or WEATHER_CITIES)
+    return max(readings.values(), default=0.0)
 
-def detect_emerging_threats(all_titles):
+
+def detect_emerging_threats(all_headlines, risk_keywords=None, verbose=True):
    
     words = []
-    for title in all_titles:
-        clean = ''.join(e for e in title.lower() if e.isalnum() or e.isspace())
-        words.extend(clean.split())
+    for headline in all_headlines:
+        words.extend(headline.clean_tokens)
     
     bigrams = zip(words, words[1:])
     counts = Counter(bigrams)
@@ -391,159 +587,847 @@ def detect_emerging_threats(all_titles):
             if phrase[0] in stopwords or phrase[1] in stopwords:
                 continue
             
-            is_known = False
-            for risk_type in RISK_KEYWORDS.values():
-                for key in risk_type:
-                    if key in phrase_str:
-                        is_known = True
-            
-            if not is_known:
+            if not is_known_risk_phrase(phrase_str, risk_keywords):
                 emerging_risk_score += 15 
                 top_emerging_threat = phrase_str
-                logging.info(f"🚨 EMERGING THREAT DETECTED: '{phrase_str}' (Count: {count})")
+                if verbose:
+                    logging.info(f"🚨 EMERGING THREAT DETECTED: '{phrase_str}' (Count: {count})")
     
     return emerging_risk_score, top_emerging_threat
 
 
-def calculate_news_risk():
-    
-    CACHE_KEY = "news_data"
-    TTL = 900 
-
-    if is_cache_valid(CACHE_KEY, TTL):
-        logging.info("⚡ Using Cached News Data")
-        return get_from_cache(CACHE_KEY)
+def is_known_risk_phrase(phrase_str, risk_keywords=None):
+    """True when a phrase already contains one of the RISK_KEYWORDS."""
+    for risk_type in (risk_keywords or RISK_KEYWORDS).values():
+        for key in risk_type:
+            if key in phrase_str:
+                return True
+    return False
 
-    rss_urls = RSS_FEEDS
-    
-    total_news_score = 0
-    current_scan_headlines = [] 
-    all_titles_raw = [] 
-    
-    logging.info("Scanning Expanded Intelligence Network (Sources)...")
-    
-    time_threshold = datetime.datetime.now(SL_TIMEZONE) - datetime.timedelta(hours=6)
-    
-    for url in rss_urls:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:10]:
-                article_time = None
-                if hasattr(entry, 'published'):
-                    try:
-                        article_time = parser.parse(entry.published)
-                        if article_time.tzinfo is None:
-                            article_time = article_time.replace(tzinfo=pytz.utc)
-                        article_time = article_time.astimezone(SL_TIMEZONE)
-                    except:
-                        pass 
-                
-                if article_time and article_time < time_threshold:
-                    continue
 
-                title_raw = entry.title.lower()
-                
-                if any(k in title_raw for k in IGNORE_KEYWORDS):
-                    continue
-                
-                all_titles_raw.append(title_raw)
+def match_risk_keywords(title_raw, risk_keywords=None, tokens=None, substring_fallback=True):
+    """
+    Scores a lowercased headline against RISK_KEYWORDS. Returns (score, sector_tag).
+    `substring_fallback=False` matches whole tokens only, for long text such as article bodies,
+    where high keywords turn up inside harmless words ("riot" in "patriotic").
+    """
+    risk_keywords = risk_keywords or RISK_KEYWORDS
+    if tokens is None:
+        tokens = title_raw.split()
+    score = 0
+    sector_tag = "General"
+
+    high_keys = list(risk_keywords["high"].keys())
+    med_keys = list(risk_keywords["medium"].keys())
+    low_keys = list(risk_keywords["low"].keys())
+
+    for token in tokens:
+        matches_high = difflib.get_close_matches(token, high_keys, n=1, cutoff=0.85)
+        if matches_high:
+            score = 25
+            matched_word = matches_high[0]
+            sector_tag = risk_keywords["high"][matched_word][0].capitalize()
+            break
 
-                tokens = title_raw.split()
-                score = 0
-                sector_tag = "General"
-                
-                high_keys = list(RISK_KEYWORDS["high"].keys())
-                med_keys = list(RISK_KEYWORDS["medium"].keys())
-                low_keys = list(RISK_KEYWORDS["low"].keys())
-
-                for token in tokens:
-                    matches_high = difflib.get_close_matches(token, high_keys, n=1, cutoff=0.85)
-                    if matches_high:
-                        score = 25
-                        matched_word = matches_high[0]
-                        sector_tag = RISK_KEYWORDS["high"][matched_word][0].capitalize()
+        matches_med = difflib.get_close_matches(token, med_keys, n=1, cutoff=0.85)
+        if matches_med:
+            score = 10
+            matched_word = matches_med[0]
+            sector_tag = risk_keywords["medium"][matched_word][0].capitalize()
+
+        matches_low = difflib.get_close_matches(token, low_keys, n=1, cutoff=0.85)
+        if matches_low and score == 0:
+            score = 5
+            matched_word = matches_low[0]
+            sector_tag = risk_keywords["low"][matched_word][0].capitalize()
+
+    if score == 0 and substring_fallback:
+        for word, sectors in risk_keywords["high"].items():
+            if word in title_raw:
+                score = 25
+                sector_tag = sectors[0].capitalize()
+
+    return score, sector_tag
+
+
+def sentiment_boost(title_raw):
+    """Extra risk points for strongly negative headlines."""
+    blob = TextBlob(title_raw)
+    if blob.sentiment.polarity < -0.3:
+        return 5
+    return 0
+
+
+class _ArticleTextParser(HTMLParser):
+    """Collects page text, keeping <p> text separately, skipping scripts and styles."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.all_parts = []
+        self._in_paragraph = 0
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript"):
+            self._skip += 1
+        elif tag == "p":
+            self._in_paragraph += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript") and self._skip:
+            self._skip -= 1
+        elif tag == "p" and self._in_paragraph:
+            self._in_paragraph -= 1
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self.all_parts.append(data)
+        if self._in_paragraph:
+            self.parts.append(data)
+
+
+def _clip_words(text):
+    return " ".join(text.lower().split()[:ENRICH_MAX_WORDS])
+
+
+def extract_article_text(html):
+    """Plain paragraph text from an HTML page or summary, parsed once per distinct content."""
+    digest = hashlib.sha1(html.encode("utf-8", "ignore")).hexdigest()
+    if digest in _ENRICH_PARSE_CACHE:
+        metrics.incr("enrichment_parse_cache_hit")
+        return _ENRICH_PARSE_CACHE[digest]
+
+    text_parser = _ArticleTextParser()
+    try:
+        text_parser.feed(html)
+        text_parser.close()
+    except Exception:
+        pass
+    # Article pages keep their story in <p> tags; feed summaries are usually bare text.
+    text = _clip_words(" ".join(text_parser.parts or text_parser.all_parts))
+    if len(_ENRICH_PARSE_CACHE) > ENRICH_CACHE_LIMIT:
+        _ENRICH_PARSE_CACHE.clear()
+    _ENRICH_PARSE_CACHE[digest] = text
+    return text
+
+
+def fetch_article_text(url):
+    """Fetches at most ENRICH_MAX_BYTES of an article once per URL and returns its text."""
+    if url in _ENRICH_URL_CACHE:
+        metrics.incr("enrichment_url_cache_hit")
+        return _ENRICH_URL_CACHE[url]
+
+    text = ""
+    try:
+        with transport.get(url, timeout=ENRICH_FETCH_TIMEOUT, stream=True) as r:
+            if r.status_code == 200 and "html" in r.headers.get("Content-Type", "html"):
+                body = b""
+                for chunk in r.iter_content(chunk_size=16384):
+                    body += chunk
+                    if len(body) >= ENRICH_MAX_BYTES:
+                        metrics.incr("enrichment_truncated")
                         break
-                    
-                    matches_med = difflib.get_close_matches(token, med_keys, n=1, cutoff=0.85)
-                    if matches_med:
-                        score = 10
-                        matched_word = matches_med[0]
-                        sector_tag = RISK_KEYWORDS["medium"][matched_word][0].capitalize()
-                        
-                    matches_low = difflib.get_close_matches(token, low_keys, n=1, cutoff=0.85)
-                    if matches_low and score == 0:
-                        score = 5
-                        matched_word = matches_low[0]
-                        sector_tag = RISK_KEYWORDS["low"][matched_word][0].capitalize()
-                
-                if score == 0:
-                    for word, sectors in RISK_KEYWORDS["high"].items():
-                        if word in title_raw:
-                            score = 25
-                            sector_tag = sectors[0].capitalize()
+                text = extract_article_text(body[:ENRICH_MAX_BYTES].decode(r.encoding or "utf-8", "ignore"))
+    except Exception as e:
+        metrics.incr("enrichment_errors")
+        logging.debug(f"Article fetch failed {url}: {e}")
 
-                blob = TextBlob(title_raw)
-                if blob.sentiment.polarity < -0.3:
-                    score += 5
+    if len(_ENRICH_URL_CACHE) > ENRICH_CACHE_LIMIT:
+        _ENRICH_URL_CACHE.clear()
+    _ENRICH_URL_CACHE[url] = text
+    return text
 
-                total_news_score += score
-                
-                if score > 0:
-                    current_scan_headlines.append({
-                        "Headline": entry.title,
-                        "Risk": score,
-                        "Sector": sector_tag,
-                        "Link": entry.link,
-                        "Timestamp": datetime.datetime.now(SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                    
-        except Exception as e:
-            logging.error(f"Feed Error {url}: {e}")
 
-    emerging_score, emerging_topic = detect_emerging_threats(all_titles_raw)
-    if emerging_score > 0:
-        total_news_score += emerging_score
-        search_query = emerging_topic.replace(' ', '+')
-        smart_link = f"https://www.google.com/search?q={search_query}+Sri+Lanka+News"
-        current_scan_headlines.insert(0, {
-            "Headline": f"⚠️ Emerging Trend: {emerging_topic.upper()}",
-            "Risk": emerging_score,
-            "Sector": "Uncategorized",
-            "Link": smart_link,
-            "Timestamp": datetime.datetime.now(SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
-        })
+def enrich_entries(entries, budget=ENRICH_TOTAL_BUDGET, max_articles=ENRICH_MAX_ARTICLES):
+    """
+    Returns {index: text} for Headline records, using the feed summary where it is enough and
+    fetching up to `max_articles` bodies with bounded concurrency inside `budget` seconds.
+    """
+    texts = {}
+    to_fetch = {}
+    for index, headline in enumerate(entries):
+        summary = headline.summary
+        if summary:
+            texts[index] = extract_article_text(summary)
+        link = headline.link
+        if (ENRICH_FETCH_BODIES and link and len(to_fetch) < max_articles
+                and len(texts.get(index, "").split()) < ENRICH_MIN_SUMMARY_WORDS):
+            to_fetch[index] = link
+
+    if not to_fetch or budget <= 0:
+        return texts
+
+    pool = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS)
+    futures = {pool.submit(fetch_article_text, link): index for index, link in to_fetch.items()}
+    done, not_done = wait(futures, timeout=budget)
+    pool.shutdown(wait=False, cancel_futures=True)
+    if not_done:
+        metrics.incr("enrichment_timed_out", len(not_done))
+        logging.warning(f"Enrichment budget hit: {len(not_done)} articles skipped.")
+
+    for future in done:
+        body_text = future.result()
+        if body_text:
+            index = futures[future]
+            texts[index] = _clip_words(f"{texts.get(index, '')} {body_text}")
+            metrics.incr("entries_enriched")
+    return texts
+
+
+class Headline:
+    """
+    One scanned headline, normalised once and shared by every stage. Tokens are derived
+    lazily; times are epoch seconds and only formatted when a record leaves the scan.
+    """
+
+    __slots__ = ("title", "lower", "link", "feed", "summary", "published", "seen",
+                 "score", "sector", "locations", "key", "_tokens", "_clean_tokens")
+
+    def __init__(self, title, link="", feed="", summary=None, published=None, seen=None,
+                 score=0, sector="General", locations=(), key=None):
+        self.title = title
+        self.lower = title.lower()
+        self.link = link
+        self.feed = sys.intern(feed)
+        self.summary = summary
+        self.published = published
+        self.seen = seen if seen is not None else time.time()
+        self.score = score
+        self.sector = sector
+        self.locations = locations
+        self.key = key
+        self._tokens = None
+        self._clean_tokens = None
+
+    @classmethod
+    def from_entry(cls, entry, feed_url, published=None):
+        return cls(
+            entry.title,
+            link=entry.get("link", ""),
+            feed=feed_url,
+            summary=entry.get("summary", "") if ENRICH_ARTICLES else None,
+            published=published,
+            key=entry_key(entry),
+        )
+
+    @property
+    def tokens(self):
+        """Whitespace tokens of the lowercased title, as used by keyword matching."""
+        if self._tokens is None:
+            self._tokens = tuple(self.lower.split())
+        return self._tokens
+
+    @property
+    def clean_tokens(self):
+        """Tokens with punctuation stripped, as used by emerging-threat detection."""
+        if self._clean_tokens is None:
+            clean = ''.join(e for e in self.lower if e.isalnum() or e.isspace())
+            self._clean_tokens = tuple(clean.split())
+        return self._clean_tokens
+
+    def mentions(self, *words):
+        return any(word in self.lower for word in words)
+
+    def to_state(self):
+        """Scored fields only, for handing a headline between processes or runs (run_shard, NewsWindow)."""
+        return {"title": self.title, "link": self.link, "feed": self.feed, "published": self.published,
+                "seen": self.seen, "score": self.score, "sector": self.sector, "locations": list(self.locations)}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**{**state, "locations": tuple(state.get("locations", ()))})
+
+    def to_record(self):
+        return {
+            "Headline": self.title,
+            "Risk": self.score,
+            "Sector": self.sector,
+            "Link": self.link,
+            "Timestamp": datetime.datetime.fromtimestamp(self.seen, SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S"),
+            "Locations": ", ".join(self.locations),
+        }
+
 
-   
-    if current_scan_headlines:
-        new_df = pd.DataFrame(current_scan_headlines)
-        if os.path.exists(NEWS_LOG_FILE):
+def stream_feeds(urls, deadline=None):
+    """Fetch stage: yields (url, feed) as each distinct feed finishes downloading, fastest first.
+    `deadline` is a time.monotonic() value after which unfinished feeds are abandoned."""
+    def fetch(url):
+        with metrics.stage("feed_fetch", label=url):
+            response = transport.get(url, timeout=FEED_FETCH_TIMEOUT)
+            response.raise_for_status()
+            headers = {k.lower(): v for k, v in response.headers.items() if k.lower() in FEED_HEADERS}
+            return feedparser.parse(response.content, response_headers=headers)
+
+    unique_urls = list(dict.fromkeys(urls))
+    pool = ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS)
+    futures = {pool.submit(fetch, url): url for url in unique_urls}
+    timeout = None if deadline is None else max(0, deadline - time.monotonic())
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            url = futures[future]
             try:
-                old_df = pd.read_csv(NEWS_LOG_FILE)
+                yield url, future.result()
+            except Exception as e:
+                metrics.incr("feed_errors")
+                logging.error(f"Feed Error {url}: {e}")
+    except FutureTimeout:
+        late = [url for future, url in futures.items() if not future.done()]
+        metrics.incr("feed_timeouts", len(late))
+        logging.warning(f"Feed deadline reached, skipping {len(late)} slow feeds: {', '.join(late)}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_feeds(urls):
+    """Fetches and parses each distinct feed once on a shared pool. Returns {url: feed}."""
+    return dict(stream_feeds(urls))
+
+
+def iter_entries(url, feed, window=FEED_ENTRY_WINDOW):
+    """Parse stage: the newest `window` entries of one parsed feed."""
+    for entry in feed.entries[:window]:
+        metrics.incr("entries_seen")
+        yield entry
+
+
+@lru_cache(maxsize=4096)
+def _parse_published_string(published):
+    """Slow path for dates feedparser could not pre-parse. Cached, as feeds repeat across runs."""
+    try:
+        article_time = parser.parse(published)
+    except (ValueError, OverflowError, TypeError):
+        return None
+    if article_time.tzinfo is None:
+        article_time = article_time.replace(tzinfo=pytz.utc)
+    return article_time.timestamp()
+
+
+def entry_published_time(entry):
+    """Publication time as epoch seconds, or None when the entry carries no usable date."""
+    # feedparser already normalises recognised dates to a UTC struct_time.
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        return float(calendar.timegm(parsed))
+    published = entry.get("published")
+    if published:
+        return _parse_published_string(published)
+    return None
+
+
+def filter_recent(entries, time_threshold, feed_url="", ordering=None):
+    """
+    Time filter stage: drops entries published before `time_threshold` (epoch seconds) and
+    yields (entry, published). Feeds seen to list newest-first are cut at the first stale entry.
+    `ordering` is where that is remembered per feed: a NewsWindow's persisted map, or by
+    default _FEED_ORDERING, which only lasts as long as the process.
+    """
+    ordering = _FEED_ORDERING if ordering is None else ordering
+    newest_first = ordering.get(feed_url, False)
+    in_order = True
+    previous = None
+    for entry in entries:
+        with metrics.stage("entry_time_parse"):
+            published = entry_published_time(entry)
+
+        if published is not None:
+            if previous is not None and published > previous:
+                in_order = False
+            previous = published
+
+        if published is not None and published < time_threshold:
+            metrics.incr("entries_filtered_stale")
+            if newest_first and in_order:
+                metrics.incr("feeds_cut_early")
+                break
+            continue
+        yield entry, published
+
+    if feed_url:
+        ordering[feed_url] = in_order and previous is not None
+
+
+def entry_key(entry):
+    """Identity of a feed entry across polls: its GUID, else its link, else its title."""
+    return entry.get("id") or entry.get("link") or entry.get("title", "")
+
+
+def filter_unseen(entries, window, feed_url):
+    """
+    High-water mark stage: drops (entry, published) pairs already processed on an earlier run.
+    On feeds known to list newest-first, the first seen entry at or below the mark ends the
+    feed, as everything after it is older. Entries are marked seen by NewsScan.absorb once
+    scored, so the entries of a feed that fails part way are scanned again on the next run.
+    """
+    mark = window.mark(feed_url)
+    high_water = mark["newest"] or 0
+    newest_first = window.ordering.get(feed_url, False)
+    in_order = True
+    previous = None
+    for entry, published in entries:
+        if published is not None:
+            if previous is not None and published > previous:
+                in_order = False
+            previous = published
+
+        key = entry_key(entry)
+        if key in mark["seen"]:
+            metrics.incr("entries_already_seen")
+            if newest_first and in_order and published is not None and published <= high_water:
+                metrics.incr("feeds_cut_at_mark")
+                return
+            continue
+        yield entry, published
+
+
+def filter_ignored(entries, ignore_keywords, feed_url=""):
+    """Ignore filter stage: drops sport/entertainment noise and yields Headline records."""
+    for entry, published in entries:
+        headline = Headline.from_entry(entry, feed_url, published)
+        if headline.mentions(*ignore_keywords):
+            metrics.incr("entries_filtered_ignored")
+            continue
+        metrics.incr("entries_kept")
+        yield headline
+
+
+def score_entries(headlines, risk_keywords, enriched_texts=None):
+    """Score stage: fills in score and sector on each Headline and yields it."""
+    enriched_texts = enriched_texts or {}
+    for index, headline in enumerate(headlines):
+        with metrics.stage("keyword_match"):
+            score, sector_tag = match_risk_keywords(headline.lower, risk_keywords, headline.tokens)
+            body_text = enriched_texts.get(index)
+            if body_text:
+                body_score, body_sector = match_risk_keywords(body_text, risk_keywords, substring_fallback=False)
+                if body_score > score:
+                    score, sector_tag = body_score, body_sector
+                    metrics.incr("enrichment_rescored")
+
+        with metrics.stage("sentiment"):
+            boost = sentiment_boost(headline.lower)
+            if body_text and not boost:
+                boost = sentiment_boost(body_text)
+            score += boost
+
+        headline.score = score
+        headline.sector = sector_tag
+        headline.seen = time.time()
+        yield headline
+
+
+def append_news_log(news_log_file, headlines):
+    """Merges headlines into the rolling news log (emerging trends first, newest 100 kept)."""
+    new_df = pd.DataFrame(headlines)
+    with file_lock(news_log_file):
+        if os.path.exists(news_log_file):
+            try:
+                old_df = pd.read_csv(news_log_file)
                 combined_df = pd.concat([old_df, new_df])
                 combined_df.drop_duplicates(subset=["Headline"], keep='last', inplace=True)
                 combined_df['SortKey'] = combined_df['Headline'].apply(lambda x: 0 if "Emerging Trend" in str(x) else 1)
                 combined_df = combined_df.sort_values(by=['SortKey', 'Timestamp'], ascending=[True, False])
                 combined_df = combined_df.drop(columns=['SortKey'])
                 if len(combined_df) > 100: combined_df = combined_df.head(100)
-                combined_df.to_csv(NEWS_LOG_FILE, index=False)
+                atomic_write_csv(combined_df, news_log_file)
             except Exception:
-                new_df.to_csv(NEWS_LOG_FILE, index=False)
+                atomic_write_csv(new_df, news_log_file)
         else:
-            new_df.to_csv(NEWS_LOG_FILE, index=False)
-        
-    result = (min(100, total_news_score), current_scan_headlines)
-    save_to_cache(CACHE_KEY, result)
-    return result
+            atomic_write_csv(new_df, news_log_file)
+
+
+class BatchingSink:
+    """Buffers flagged headlines and hands them to `flush_batch` by size or age."""
 
+    name = "sink"
 
+    def __init__(self, max_batch=SINK_MAX_BATCH, max_delay=SINK_MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = []
+        self.last_flush = time.monotonic()
 
+    def write(self, headlines):
+        self.pending.extend(headlines)
+        if len(self.pending) >= self.max_batch or time.monotonic() - self.last_flush >= self.max_delay:
+            self.flush()
 
-def calculate_continuous_economy_risk(usd_rate, oil_price):
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            with metrics.stage("sink_flush", label=self.name):
+                self.flush_batch(batch)
+        except Exception as e:
+            metrics.incr("sink_errors")
+            logging.error(f"{self.name} sink flush failed: {e}")
+
+    def flush_batch(self, batch):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def discard(self):
+        """Drops buffered headlines without writing them (the scan was abandoned)."""
+        self.pending = []
+
+
+class CsvNewsSink(BatchingSink):
+    """Appends flagged headlines to the profile's daily_news_scan.csv as they arrive."""
+
+    name = "csv"
+
+    def __init__(self, news_log_file, **kwargs):
+        super().__init__(**kwargs)
+        self.news_log_file = news_log_file
+
+    def flush_batch(self, batch):
+        append_news_log(self.news_log_file, [h.to_record() for h in batch])
+
+
+class FirestoreNewsSink(BatchingSink):
+    """
+    Writes flagged headlines to newsHistory and merges the running list into riskData/latest,
+    so the dashboard sees high-risk stories before the rest of the scan has finished.
+    """
+
+    name = "firestore"
+
+    def __init__(self, profile, published=(), **kwargs):
+        super().__init__(**kwargs)
+        self.root = firestore_root(profile)
+        # With a NewsWindow the scan only emits new headlines; the window's flagged items
+        # seed the list so the live feed keeps them while the scan runs.
+        self.published = list(published)
+
+    def flush_batch(self, batch):
+        write_batch = DB.batch()
+        news_collection = DB.collection(f'{self.root}/newsHistory')
+        for headline in batch:
+            doc_id = hashlib.sha1(headline.title.encode("utf-8")).hexdigest()[:20]
+            write_batch.set(news_collection.document(doc_id), headline.to_record())
+        write_batch.commit()
+
+        self.published = sorted(self.published + batch, key=lambda h: h.score, reverse=True)
+        DB.document(f'{self.root}/riskData/latest').set(
+            {"Headlines": [h.to_record() for h in self.published], "Scan_Status": "in_progress"}, merge=True
+        )
+
+
+def news_sinks(profile, window=None):
+    sinks = [CsvNewsSink(profile_files(profile)["news_log"])]
+    if DB and FIRESTORE_ENABLED:
+        published = []
+        if window is not None:
+            time_threshold = time.time() - profile["news_window_hours"] * 3600
+            published = [h for h in window.merged([], time_threshold) if h.score > 0]
+        sinks.append(FirestoreNewsSink(profile, published))
+    return sinks
+
+
+def end_live_scan(profile):
+    """Clears the sink's in-progress marker when a profile's scan ends without being published."""
+    if not DB or not FIRESTORE_ENABLED:
+        return
+    try:
+        DB.document(f'{firestore_root(profile)}/riskData/latest').set({"Scan_Status": firestore.DELETE_FIELD}, merge=True)
+    except Exception as e:
+        logging.error(f"Could not clear Scan_Status [{profile['name']}]: {e}")
+
+
+class FeedScheduler:
+    """
+    Learns how often each feed publishes (an EWMA of the mean gap between its entries) and
+    decides which feeds are due. A skipped feed's entries stay in each profile's NewsWindow.
+    """
+
+    def __init__(self, path=FEED_SCHEDULE_FILE):
+        self.path = path
+        self.feeds = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.feeds = json.load(f)
+            except Exception as e:
+                logging.warning(f"Feed schedule unreadable, polling every feed: {e}")
+
+    def poll_interval(self, url):
+        gap = self.feeds.get(url, {}).get("gap")
+        if gap is None:
+            return POLL_MIN_INTERVAL
+        return min(POLL_MAX_INTERVAL, max(POLL_MIN_INTERVAL, gap * POLL_GAP_FRACTION))
+
+    def is_due(self, url, now):
+        last_polled = self.feeds.get(url, {}).get("last_polled", 0)
+        return now - last_polled + POLL_SLACK >= self.poll_interval(url)
+
+    def observe(self, url, feed, now):
+        """Records a successful poll and folds the feed's entry spacing into its rate."""
+        state = self.feeds.setdefault(url, {})
+        state["last_polled"] = now
+        times = sorted(
+            (t for t in (entry_published_time(e) for e in feed.entries[:FEED_ENTRY_WINDOW]) if t),
+            reverse=True,
+        )
+        if len(times) < 2:
+            return
+        observed_gap = (times[0] - times[-1]) / (len(times) - 1)
+        previous = state.get("gap")
+        state["gap"] = observed_gap if previous is None else POLL_EWMA_ALPHA * observed_gap + (1 - POLL_EWMA_ALPHA) * previous
+        state["newest_entry"] = times[0]
+
+    def save(self):
+        with file_lock(self.path):
+            atomic_write_json(self.feeds, self.path)
+
+
+class NewsWindow:
+    """
+    Persisted state of one profile's incremental scan: a high-water mark per feed (entries
+    already processed and the newest publish time), whether each feed lists newest-first, and
+    the scored headlines still inside the news window, from which each run's news score is
+    aggregated.
+    """
+
+    def __init__(self, path, entry_window=FEED_ENTRY_WINDOW):
+        self.path = path
+        self.entry_window = entry_window
+        self.marks = {}
+        self.ordering = {}
+        self.items = []
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    state = json.load(f)
+                self.marks = state.get("marks", {})
+                self.ordering = state.get("ordering", {})
+                self.items = [Headline.from_state(s) for s in state.get("items", [])]
+            except Exception as e:
+                logging.warning(f"News window unreadable, rescanning every entry: {e}")
+                self.marks, self.ordering, self.items = {}, {}, []
+
+    def mark(self, url):
+        return self.marks.setdefault(url, {"seen": {}, "newest": None})
+
+    def remember(self, headline):
+        """Marks a scored headline's entry as seen on its feed."""
+        self.mark(headline.feed)["seen"][headline.key] = headline.published or time.time()
+
+    def advance(self, url, headlines):
+        """
+        Raises the feed's high-water mark to its newest scored headline. Only called once the
+        whole feed was scored: after a failure the next run steps past the entries already
+        marked instead of cutting the feed at them.
+        """
+        mark = self.mark(url)
+        for h in headlines:
+            if h.published is not None and h.published > (mark["newest"] or 0):
+                mark["newest"] = h.published
+
+    def merged(self, headlines, time_threshold):
+        """
+        The window with `headlines` added and anything published before `time_threshold`
+        dropped. Each feed keeps its newest `entry_window` items, as a full scan would.
+        """
+        by_feed = {}
+        for h in self.items + list(headlines):
+            if (h.published or h.seen) >= time_threshold:
+                by_feed.setdefault(h.feed, []).append(h)
+        kept = []
+        for items in by_feed.values():
+            items.sort(key=lambda h: h.published or h.seen, reverse=True)
+            kept.extend(items[:self.entry_window])
+        return kept
+
+    def update(self, headlines, time_threshold):
+        """Adds a run's new headlines, expires old ones and forgets marks that have left the window."""
+        previous = len(self.items)
+        self.items = self.merged(headlines, time_threshold)
+        metrics.incr("window_expired", max(0, previous + len(headlines) - len(self.items)))
+        for mark in self.marks.values():
+            mark["seen"] = {key: t for key, t in mark["seen"].items() if t >= time_threshold}
+        return self.items
+
+    def save(self):
+        state = {"marks": self.marks, "ordering": self.ordering, "items": [h.to_state() for h in self.items]}
+        with file_lock(self.path):
+            atomic_write_json(state, self.path)
+
+
+def news_window(profile):
+    """The profile's NewsWindow when INCREMENTAL_NEWS is on, else None (full scans)."""
+    if not INCREMENTAL_NEWS:
+        return None
+    return NewsWindow(profile_files(profile)["news_window"], profile["entry_window"])
+
+
+class NewsScan:
+    """
+    Incremental news scoring for one profile. Feeds are pushed in as they complete and run
+    through parse -> time filter -> high-water mark -> ignore filter -> score; flagged headlines
+    go to the sinks in batches. finish() adds the emerging-threat signal, which needs every title.
+    With a NewsWindow only new entries are scored, and finish() aggregates over the whole window.
+    """
+
+    def __init__(self, profile, sinks=(), window=None, abandoned=None):
+        self.profile = profile
+        self.sinks = list(sinks)
+        self.window = window
+        # Set by acquire_sources when the news source overruns and a fallback was published: the
+        # scan still finishes, refreshing the cache and saving its window for the next run, but
+        # no longer writes to its sinks.
+        self.abandoned = abandoned or threading.Event()
+        self.tag_locations = profile.get("gazetteer", False)
+        self.total_news_score = 0
+        self.headlines = []
+        self.scanned = []
+        self.time_threshold = time.time() - profile["news_window_hours"] * 3600
+        # Seconds of enrichment left for this scan. Only time spent inside enrich_entries counts,
+        # so feeds that arrive late in the stream still get their share.
+        self.enrich_budget = ENRICH_TOTAL_BUDGET
+        self.enrich_quota = ENRICH_MAX_ARTICLES
+
+    def process_feed(self, url, feed):
+        try:
+            entries = filter_recent(iter_entries(url, feed, self.profile["entry_window"]), self.time_threshold, url,
+                                    None if self.window is None else self.window.ordering)
+            if self.window is not None:
+                entries = filter_unseen(entries, self.window, url)
+            candidates = list(filter_ignored(entries, self.profile["ignore_keywords"], url))
+
+            enriched_texts = {}
+            if ENRICH_ARTICLES and candidates:
+                started = time.monotonic()
+                with metrics.stage("enrichment"):
+                    enriched_texts = enrich_entries(
+                        candidates,
+                        budget=self.enrich_budget,
+                        max_articles=self.enrich_quota,
+                    )
+                self.enrich_budget -= time.monotonic() - started
+                self.enrich_quota = max(0, self.enrich_quota - len(candidates))
+
+            scanned_before = len(self.scanned)
+            self.absorb(score_entries(candidates, self.profile["risk_keywords"], enriched_texts))
+            if self.window is not None:
+                self.window.advance(url, self.scanned[scanned_before:])
+        except Exception as e:
+            metrics.incr("feed_errors")
+            logging.error(f"Feed Error {url}: {e}")
+
+    def absorb(self, scored):
+        """Adds scored headlines to the totals and passes the flagged ones to the sinks."""
+        flagged = []
+        for headline in scored:
+            if self.window is not None and headline.key is not None:
+                self.window.remember(headline)
+            self.scanned.append(headline)
+            self.total_news_score += headline.score
+            if headline.score > 0:
+                metrics.incr("headlines_flagged")
+                if self.tag_locations:
+                    headline.locations = gazetteer.locate(headline.lower)
+                flagged.append(headline)
+
+        self.headlines.extend(flagged)
+        self._emit(flagged)
+
+    def _emit(self, headlines):
+        if not headlines or self.abandoned.is_set():
+            return
+        for sink in self.sinks:
+            sink.write(headlines)
+
+    def finish(self):
+        pool = self.scanned
+        if self.window is not None:
+            pool = self.window.update(self.scanned, self.time_threshold)
+            self.total_news_score = sum(h.score for h in pool)
+            self.headlines = sorted((h for h in pool if h.score > 0), key=lambda h: h.published or h.seen, reverse=True)
+            metrics.incr("window_headlines", len(pool))
+
+        trend = emerging_trend(self.profile, pool)
+        if trend is not None:
+            self.total_news_score += trend.score
+            self.headlines.insert(0, trend)
+            self._emit([trend])
+
+        for sink in self.sinks:
+            if self.abandoned.is_set():
+                sink.discard()
+            else:
+                sink.close()
+        if self.window is not None:
+            try:
+                self.window.save()
+            except Exception as e:
+                logging.error(f"News window write failed [{self.profile['name']}]: {e}")
+        return min(100, self.total_news_score), self.headlines
+
+    def emerging_spike(self):
+        pool = self.scanned if self.window is None else self.window.merged(self.scanned, self.time_threshold)
+        score, _ = detect_emerging_threats(pool, self.profile["risk_keywords"], verbose=False)
+        return score >= EMERGING_SPIKE_SCORE
+
+
+def emerging_trend(profile, pool):
+    """The emerging-threat pseudo-headline for a pool of scored headlines, or None."""
+    with metrics.stage("emerging_threats"):
+        emerging_score, emerging_topic = detect_emerging_threats(pool, profile["risk_keywords"])
+    if emerging_score <= 0:
+        return None
+    search_query = emerging_topic.replace(' ', '+')
+    smart_link = f"https://www.google.com/search?q={search_query}+{profile['search_suffix'].replace(' ', '+')}"
+    return Headline(
+        f"⚠️ Emerging Trend: {emerging_topic.upper()}",
+        link=smart_link,
+        score=emerging_score,
+        sector="Uncategorized",
+        locations=gazetteer.locate(emerging_topic) if profile.get("gazetteer", False) else (),
+    )
+
+
+def get_cached_news(profile):
+    CACHE_KEY = f"news_data:{profile['name']}"
+    TTL = 900
+    if is_cache_valid(CACHE_KEY, TTL):
+        logging.info(f"⚡ Using Cached News Data [{profile['name']}]")
+        metrics.incr("cache_hit_news")
+        return get_from_cache(CACHE_KEY)
+    return None
+
+
+def calculate_news_risk(profile=None, feeds=None):
+    """Scores a profile's feeds. `feeds` is a pre-fetched {url: feed} map; otherwise feeds are streamed."""
+    profile = profile or PROFILES[DEFAULT_PROFILE]
+    cached = get_cached_news(profile)
+    if cached is not None:
+        return cached
+
+    logging.info(f"Scanning Expanded Intelligence Network [{profile['name']}] ({len(profile['feeds'])} sources)...")
+    window = news_window(profile)
+    scan = NewsScan(profile, news_sinks(profile, window), window)
+    if feeds is None:
+        feed_stream = stream_feeds(profile["feeds"])
+    else:
+        feed_stream = ((url, feeds[url]) for url in profile["feeds"] if feeds.get(url) is not None)
+    for url, feed in feed_stream:
+        scan.process_feed(url, feed)
+
+    result = scan.finish()
+    save_to_cache(f"news_data:{profile['name']}", result)
+    return result
+
+
+def calculate_continuous_economy_risk(usd_rate, oil_price, usd_baseline=290):
     """
     New Behavior: Continuous. Moves with every Rupee/Dollar.
     """
    
-    usd_baseline = 290
     usd_risk = 0
     if usd_rate > usd_baseline:
         usd_risk = (usd_rate - usd_baseline) * 1.5
@@ -557,12 +1441,13 @@ def calculate_continuous_economy_risk(usd_rate, oil_price):
     return total_eco_risk
 
 
-def calculate_dynamic_env_risk(headlines):
+def calculate_dynamic_env_risk(headlines, max_rain=None, verbose=True):
    
     base_risk = 15
     
     
-    max_rain = get_weather_data()
+    if max_rain is None:
+        max_rain = get_weather_data()
     
    
     rain_risk = max_rain * 2.0
@@ -570,25 +1455,72 @@ def calculate_dynamic_env_risk(headlines):
     
     news_env_escalation = 0
     for h in headlines:
-        title_l = h['Headline'].lower()
-        if "flood" in title_l or "landslide" in title_l or "overflow" in title_l:
+        if h.mentions("flood", "landslide", "overflow"):
             news_env_escalation = 50
-            logging.info("🌊 DETECTED FLOOD NEWS: Escalating Environmental Risk")
+            if verbose:
+                logging.info("🌊 DETECTED FLOOD NEWS: Escalating Environmental Risk")
             break
             
     final_env_risk = base_risk + rain_risk + news_env_escalation
     return min(100, int(final_env_risk))
 
 
-def calculate_weighted_total_risk(news, eco, env, social):
+def calculate_social_risk(news_risk, eco_risk):
+    """
+    Social pressure from news and the economy. Also takes numpy arrays (stress_test.py),
+    truncated element-wise as int() truncates a single score.
+    """
+    social_risk = (news_risk * 0.4) + (eco_risk * 0.4) + 10
+    if hasattr(social_risk, "astype"):
+        return social_risk.astype("int64")
+    return int(social_risk)
+
+
+def calculate_district_risk(headlines, rain_readings, eco_risk, weights=None):
+    """
+    The national formulas applied per district: located headlines drive news and flood risk,
+    the heaviest rain among a district's weather cities drives rainfall risk, and the economy
+    is shared. Returns {district: scores} for every district with a headline or a reading.
+    """
+    by_district = {}
+    for h in headlines:
+        for district in h.locations:
+            by_district.setdefault(district, []).append(h)
+    rain = {}
+    for city, precip in rain_readings.items():
+        district = gazetteer.district_of(city)
+        if district:
+            rain[district] = max(rain.get(district, 0.0), precip or 0.0)
+
+    districts = {}
+    for district in sorted(set(by_district) | set(rain)):
+        located = by_district.get(district, [])
+        news_risk = min(100, sum(h.score for h in located))
+        env_risk = calculate_dynamic_env_risk(located, rain.get(district, 0.0), verbose=False)
+        social_risk = calculate_social_risk(news_risk, eco_risk)
+        districts[district] = {
+            "Province": gazetteer.PROVINCES[district],
+            "Headlines": len(located),
+            "News_Risk": news_risk,
+            "Rain_mm": rain.get(district, 0.0),
+            "Environmental_Risk": env_risk,
+            "Social_Risk": social_risk,
+            "Total_Risk": calculate_weighted_total_risk(news_risk, eco_risk, env_risk, social_risk, weights),
+            "Top_Headline": max(located, key=lambda h: h.score).title if located else "",
+        }
+    return districts
+
+
+def calculate_weighted_total_risk(news, eco, env, social, weights=None):
     """
     New Behavior: Weighted sum.
     """
    
-    w_eco = 0.35
-    w_news = 0.30
-    w_social = 0.20
-    w_env = 0.15
+    weights = weights or RISK_WEIGHTS
+    w_eco = weights["eco"]
+    w_news = weights["news"]
+    w_social = weights["social"]
+    w_env = weights["env"]
     
     weighted_score = (eco * w_eco) + (news * w_news) + (social * w_social) + (env * w_env)
     
@@ -601,13 +1533,13 @@ def calculate_weighted_total_risk(news, eco, env, social):
     return min(100, int(final_score))
 
 
-def analyze_history(current_score):
+def analyze_history(current_score, history_file=RISK_HISTORY_FILE):
     momentum = 0
     is_anomaly = False
     
-    if os.path.exists(RISK_HISTORY_FILE):
+    if os.path.exists(history_file):
         try:
-            df = pd.read_csv(RISK_HISTORY_FILE)
+            df = pd.read_csv(history_file)
             if not df.empty:
                 last_score = df["Total_Risk"].iloc[-1]
                 momentum = current_score - last_score
@@ -627,63 +1559,77 @@ def analyze_history(current_score):
     return momentum, is_anomaly
 
 
-def upload_to_firestore(new_record, headlines_list):
+def firestore_root(profile=None):
+    """Document path a profile writes under. The default profile keeps the original location."""
+    root = f'artifacts/{CANVAS_APP_ID}/users/{CANVAS_USER_ID}'
+    if profile and profile["name"] != DEFAULT_PROFILE:
+        root = f'{root}/profiles/{profile["name"]}'
+    return root
+
+
+def upload_to_firestore(new_record, headlines_list, profile=None, districts=None):
     """Pushes the latest risk record to Firestore."""
     if not DB or not FIRESTORE_ENABLED:
         logging.warning("Firestore is disabled. Skipping database upload.")
         return
 
     try:
-        
-        latest_doc_ref = DB.document(f'artifacts/{CANVAS_APP_ID}/users/{CANVAS_USER_ID}/riskData/latest')
-        
-        
-        data_to_save = {
-            **new_record,
-            "Headlines": headlines_list,
-            "USD": new_record.get("USD"),
-            "Oil_Price": new_record.get("Oil_Price")
-        }
-        
-        latest_doc_ref.set(data_to_save)
-        logging.info("⚡️ Successfully pushed latest risk data to Firestore.")
-        
-      
-        history_collection = DB.collection(f'artifacts/{CANVAS_APP_ID}/users/{CANVAS_USER_ID}/riskHistory')
-        doc_id = new_record['Timestamp'].replace(' ', '_')
-        history_collection.document(doc_id).set(new_record)
+        with metrics.stage("firestore_write"):
+            root = firestore_root(profile)
+            latest_doc_ref = DB.document(f'{root}/riskData/latest')
+
+            data_to_save = {
+                **new_record,
+                "Headlines": headlines_list,
+                "USD": new_record.get("USD"),
+                "Oil_Price": new_record.get("Oil_Price")
+            }
+            if districts is not None:
+                data_to_save["Districts"] = districts
+
+            latest_doc_ref.set(data_to_save)
+            logging.info(f"⚡️ Successfully pushed latest risk data to Firestore ({root}).")
+
+            history_collection = DB.collection(f'{root}/riskHistory')
+            doc_id = new_record['Timestamp'].replace(' ', '_')
+            history_collection.document(doc_id).set(new_record)
 
     except Exception as e:
         logging.error(f"FATAL FIRESTORE UPLOAD ERROR: {e}")
 
 
-def run_scraper():
-    if not os.path.exists(DATA_FOLDER):
-        os.makedirs(DATA_FOLDER)
-
-    if DEMO_MODE:
-        logging.warning("🚨 DEMO MODE ACTIVE")
+def score_profile(profile, news_result, quotes=None, readings=None):
+    """
+    Scores one profile from its finished news scan and the shared market/weather data.
+    `quotes` and `readings` are what acquire_sources (or a shard merge) already collected;
+    without them the profile's tickers and locations are fetched here.
+    """
+    files = profile_files(profile)
 
-  
-    fin_data = get_market_data()
-    news_risk, headlines = calculate_news_risk()
+    fin_data = get_market_data(profile, quotes)
+    if readings is None:
+        rain_readings = fetch_weather_readings(profile["locations"])
+    else:
+        rain_readings = {city: readings.get(city, 0.0) for city in profile["locations"]}
+    news_risk, headlines = news_result
     
     
-    eco_risk = calculate_continuous_economy_risk(fin_data["usd_lkr"], fin_data["oil_price"])
+    eco_risk = calculate_continuous_economy_risk(fin_data["usd_lkr"], fin_data["oil_price"], profile["usd_baseline"])
     
    
-    env_risk = calculate_dynamic_env_risk(headlines)
+    env_risk = calculate_dynamic_env_risk(headlines, max(rain_readings.values(), default=0.0))
     
    
-    social_risk = int((news_risk * 0.4) + (eco_risk * 0.4) + 10)
+    social_risk = calculate_social_risk(news_risk, eco_risk)
     
    
-    final_score = calculate_weighted_total_risk(news_risk, eco_risk, env_risk, social_risk)
+    final_score = calculate_weighted_total_risk(news_risk, eco_risk, env_risk, social_risk, profile["weights"])
     
-    momentum, is_anomaly = analyze_history(final_score)
+    with metrics.stage("history_analysis"):
+        momentum, is_anomaly = analyze_history(final_score, files["risk_history"])
     
     timestamp = datetime.datetime.now(SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
-    top_story = headlines[0]["Headline"] if headlines else "System Stable"
+    top_story = headlines[0].title if headlines else "System Stable"
     
     new_record = {
         "Timestamp": timestamp,
@@ -700,16 +1646,424 @@ def run_scraper():
     }
     
    
-    upload_to_firestore(new_record, headlines)
+    districts = None
+    if profile.get("gazetteer"):
+        with metrics.stage("district_risk"):
+            districts = calculate_district_risk(headlines, rain_readings, eco_risk, profile["weights"])
+
+    headline_records = [h.to_record() for h in headlines]
+    upload_to_firestore(new_record, headline_records, profile, districts)
 
     
-    df = pd.DataFrame([new_record])
-    if os.path.exists(RISK_HISTORY_FILE):
-        df.to_csv(RISK_HISTORY_FILE, mode='a', header=False, index=False)
+    with metrics.stage("csv_write", label="risk_history"), file_lock(files["risk_history"]):
+        df = pd.DataFrame([new_record])
+        if os.path.exists(files["risk_history"]):
+            df.to_csv(files["risk_history"], mode='a', header=False, index=False)
+        else:
+            df.to_csv(files["risk_history"], mode='w', header=True, index=False)
+
+    if districts:
+        with metrics.stage("csv_write", label="district_risk"), file_lock(files["district_risk"]):
+            df = pd.DataFrame([{"Timestamp": timestamp, "District": name, **scores} for name, scores in districts.items()])
+            exists = os.path.exists(files["district_risk"])
+            df.to_csv(files["district_risk"], mode='a' if exists else 'w', header=not exists, index=False)
+
+    logging.info(f"✅ [{profile['name']}] Risk: {final_score}")
+    # Same shape as the riskData/latest document.
+    record = {**new_record, "Headlines": headline_records}
+    if districts is not None:
+        record["Districts"] = districts
+    return record
+
+
+def stream_into_scans(scans, profiles, urls=None, deadline=None, on_feed=None):
+    """
+    Streams every distinct feed once (optionally only `urls`); each finished feed is handed to
+    the scans of the profiles that follow it. One single-thread executor per profile keeps a
+    profile's scan ordered while profiles run in parallel.
+    """
+    followers = {}
+    for p in profiles:
+        if p["name"] in scans:
+            for url in p["feeds"]:
+                if urls is None or url in urls:
+                    followers.setdefault(url, []).append(p["name"])
+
+    workers = {name: ThreadPoolExecutor(max_workers=1) for name in scans}
+    futures = {}
+    for url, feed in stream_feeds(list(followers), deadline):
+        if on_feed:
+            on_feed(url, feed)
+        for name in followers[url]:
+            futures[workers[name].submit(scans[name].process_feed, url, feed)] = (name, url)
+    for future, (name, url) in futures.items():
+        if future.exception() is not None:
+            metrics.incr("feed_errors")
+            logging.error(f"Feed Error {url} [{name}]: {future.exception()}")
+    for worker in workers.values():
+        worker.shutdown(wait=True)
+
+
+def scan_news(profiles, deadline=None, abandoned=None):
+    """
+    News source: runs every uncached profile's scan over one shared stream of feeds.
+    Once `abandoned` is set the scans stop writing to their sinks; the polling state and
+    news windows are still saved, so the next run starts from this scan's work.
+    """
+    news_results = {}
+    scans = {}
+    for p in profiles:
+        cached = get_cached_news(p)
+        if cached is not None:
+            news_results[p["name"]] = cached
+        else:
+            window = news_window(p)
+            scans[p["name"]] = NewsScan(p, news_sinks(p, window), window, abandoned)
+    if not scans:
+        return news_results
+
+    logging.info(f"Scanning Expanded Intelligence Network ({', '.join(scans)})...")
+    urls = list(dict.fromkeys(url for p in profiles if p["name"] in scans for url in p["feeds"]))
+    scheduler = FeedScheduler() if ADAPTIVE_POLLING and INCREMENTAL_NEWS else None
+    if scheduler is None:
+        stream_into_scans(scans, profiles, deadline=deadline)
     else:
-        df.to_csv(RISK_HISTORY_FILE, mode='w', header=True, index=False)
+        now = time.time()
+        observe = lambda url, feed: scheduler.observe(url, feed, now)
+        due = [url for url in urls if scheduler.is_due(url, now)]
+        skipped = [url for url in urls if url not in set(due)]
+        stream_into_scans(scans, profiles, urls=set(due), deadline=deadline, on_feed=observe)
+
+        # While the detector sees a spike, every feed is polled on every run.
+        if skipped and any(scan.emerging_spike() for scan in scans.values()):
+            logging.info(f"📈 Emerging-threat spike: polling {len(skipped)} skipped feeds now")
+            metrics.incr("feeds_spike_polled", len(skipped))
+            stream_into_scans(scans, profiles, urls=set(skipped), deadline=deadline, on_feed=observe)
+        elif skipped:
+            logging.info(f"⏭️ {len(skipped)} feeds not due yet; their entries stay in the news window")
+            metrics.incr("feeds_skipped", len(skipped))
+        try:
+            scheduler.save()
+        except Exception as e:
+            logging.error(f"Feed schedule write failed: {e}")
+
+    for name, scan in scans.items():
+        news_results[name] = scan.finish()
+        save_to_cache(f"news_data:{name}", news_results[name])
+    return news_results
+
+
+def _timed_source(name, func, *args):
+    with metrics.stage("source", label=name):
+        return func(*args)
+
+
+def source_fallback(name, profiles, tickers, cities):
+    """What scoring uses when a source fails or overruns its timeout."""
+    metrics.incr(f"source_fallback_{name}")
+    if name == "market":
+        # Last known quote even if expired; None makes get_market_data use its 300/75 defaults.
+        return {ticker: _CACHE_STORE.get(f"quote:{ticker}", (0, None))[1] for ticker in tickers}
+    elif name == "weather":
+        return {city: _CACHE_STORE.get(f"weather:{city}", (0, 0.0))[1] for city in cities}
+    elif name == "news":
+        return {p["name"]: news_fallback(p) for p in profiles}
+
+
+def news_fallback(profile):
+    """
+    The last scan result even if expired, else the score aggregated over the persisted news
+    window (what the previous run saw, minus what has aged out). None when neither exists:
+    a fresh process with no window has nothing real to publish.
+    """
+    cached = _CACHE_STORE.get(f"news_data:{profile['name']}")
+    if cached is not None:
+        return cached[1]
+    window = news_window(profile)
+    if window is None or not window.items:
+        return None
+    pool = window.merged([], time.time() - profile["news_window_hours"] * 3600)
+    headlines = sorted((h for h in pool if h.score > 0), key=lambda h: h.published or h.seen, reverse=True)
+    total_news_score = sum(h.score for h in pool)
+    trend = emerging_trend(profile, pool)
+    if trend is not None:
+        total_news_score += trend.score
+        headlines.insert(0, trend)
+    logging.info(f"🗂️ [{profile['name']}] News from the saved window: {len(pool)} headlines")
+    return min(100, total_news_score), headlines
+
+
+def acquire_sources(profiles):
+    """
+    Launches market, weather and news acquisition concurrently, so the run waits for the
+    slowest source instead of their sum. Returns (quotes, readings, news results) once every
+    source has finished or fallen back; scoring uses exactly these, without fetching again.
+    A profile whose news fell back to nothing has None as its news result and is not scored.
+    """
+    # Acquire every distinct ticker and location once; each profile picks its own from the result.
+    tickers = list(dict.fromkeys(t for p in profiles for t in (p["currency_ticker"], p["oil_ticker"])))
+    cities = list(dict.fromkeys(city for p in profiles for city in p["locations"]))
+
+    started = time.monotonic()
+    abandoned = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=3)
+    futures = {
+        "market": pool.submit(_timed_source, "market", fetch_market_quotes, tickers),
+        "weather": pool.submit(_timed_source, "weather", fetch_weather_readings, cities),
+        "news": pool.submit(_timed_source, "news", scan_news, profiles, started + FEED_FETCH_DEADLINE, abandoned),
+    }
+
+    results = {}
+    for name, future in futures.items():
+        remaining = SOURCE_TIMEOUTS[name] - (time.monotonic() - started)
+        try:
+            results[name] = future.result(timeout=max(0, remaining))
+        except FutureTimeout:
+            logging.warning(f"⏱️ {name} source exceeded {SOURCE_TIMEOUTS[name]}s. Using fallback.")
+            if name == "news":
+                abandoned.set()
+            results[name] = source_fallback(name, profiles, tickers, cities)
+        except Exception as e:
+            logging.error(f"{name} source failed: {e}. Using fallback.")
+            results[name] = source_fallback(name, profiles, tickers, cities)
+    # Overrunning sources finish in the background and refresh the cache (and news windows)
+    # for the next run. A one-shot process still waits for them at exit.
+    pool.shutdown(wait=False)
+
+    news_results = results["news"]
+    for p in profiles:
+        news_results.setdefault(p["name"], None)
+    return results["market"], results["weather"], news_results
+
+
+def run_scraper(profile_names=None):
+    if not os.path.exists(DATA_FOLDER):
+        os.makedirs(DATA_FOLDER)
+
+    if DEMO_MODE:
+        logging.warning("🚨 DEMO MODE ACTIVE")
+
+    metrics.start_run()
+
+    profiles = select_profiles(profile_names)
+
+    quotes, readings, news_results = acquire_sources(profiles)
+
+    records = {}
+    for p in profiles:
+        if news_results[p["name"]] is None:
+            metrics.incr("profiles_skipped")
+            logging.error(f"❌ [{p['name']}] No news scan or saved window to score from; nothing published.")
+            end_live_scan(p)
+    with ThreadPoolExecutor(max_workers=max(1, len(profiles))) as pool:
+        futures = {pool.submit(score_profile, p, news_results[p["name"]], quotes, readings): p
+                   for p in profiles if news_results[p["name"]] is not None}
+        for future, p in futures.items():
+            try:
+                records[p["name"]] = future.result()
+            except Exception as e:
+                logging.error(f"Profile {p['name']} failed: {e}")
+                end_live_scan(p)
+
+    scores = {name: record["Total_Risk"] for name, record in records.items()}
+    run_metrics = metrics.write_run_metrics({"run_timestamp": datetime.datetime.now(SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S"), "total_risk": scores,
+                                             "http_hosts": transport.host_stats(reset=True)})
+    logging.info(f"✅ RUN COMPLETE. Risk: {scores}. Data pushed to Firestore. ({run_metrics.get('wall_seconds', 0)}s)")
+    return records
+
+def select_profiles(profile_names=None):
+    all_profiles = load_profiles()
+    profiles = []
+    for name in profile_names or ACTIVE_PROFILES:
+        if name in all_profiles:
+            profiles.append(all_profiles[name])
+        else:
+            logging.error(f"Unknown scan profile '{name}'. Skipping.")
+    return profiles
+
+
+def shard_run_id():
+    """Default run id shared by workers started in the same 15 minute slot."""
+    now = datetime.datetime.now(SL_TIMEZONE)
+    return now.replace(minute=now.minute - now.minute % 15).strftime("%Y%m%d_%H%M")
+
+
+def shard_path(run_id, index, count):
+    return os.path.join(SHARDS_FOLDER, run_id, f"shard_{index}_of_{count}.json")
+
+
+def run_shard(index, count, run_id, profile_names=None):
+    """
+    Scans one partition of the work: feeds[index::count] and locations[index::count] of the
+    union across profiles, plus the market quotes on shard 0. The scored (not yet aggregated)
+    headlines are written atomically for merge_shards; nothing is published from a shard.
+    """
+    metrics.start_run()
+    profiles = select_profiles(profile_names)
+    feeds = list(dict.fromkeys(url for p in profiles for url in p["feeds"]))[index::count]
+    cities = list(dict.fromkeys(city for p in profiles for city in p["locations"]))[index::count]
+    tickers = list(dict.fromkeys(t for p in profiles for t in (p["currency_ticker"], p["oil_ticker"])))
+
+    logging.info(f"🧩 Shard {index}/{count} [{run_id}]: {len(feeds)} feeds, {len(cities)} locations "
+                 f"(merge with --merge {count} --run-id {run_id})")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        quotes = pool.submit(fetch_market_quotes, tickers) if index == 0 else None
+        readings = pool.submit(fetch_weather_readings, cities)
+        scans = {p["name"]: NewsScan(p) for p in profiles}
+        stream_into_scans(scans, profiles, urls=set(feeds), deadline=time.monotonic() + FEED_FETCH_DEADLINE)
+        quotes = quotes.result() if quotes else {}
+        readings = readings.result()
+
+    partial = {
+        "run_id": run_id,
+        "shard": index,
+        "shards": count,
+        "quotes": quotes,
+        "weather": readings,
+        "news": {name: [h.to_state() for h in scan.scanned] for name, scan in scans.items()},
+        "metrics": {**metrics.snapshot(), "http_hosts": transport.host_stats(reset=True)},
+    }
+    path = shard_path(run_id, index, count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write_json(partial, path)
+    logging.info(f"✅ Shard {index}/{count} written to {path}")
+    return path
+
+
+def merge_shards(run_id, count, profile_names=None, wait_seconds=SHARD_MERGE_WAIT):
+    """Combines the shard files of a run into the final scores, news logs and Firestore push."""
+    metrics.start_run()
+    profiles = select_profiles(profile_names)
+    paths = [shard_path(run_id, i, count) for i in range(count)]
+
+    deadline = time.monotonic() + wait_seconds
+    while not all(os.path.exists(p) for p in paths) and time.monotonic() < deadline:
+        time.sleep(1)
+    missing = [i for i, p in enumerate(paths) if not os.path.exists(p)]
+    if len(missing) == count:
+        logging.error(f"❌ No shard of run {run_id} arrived in {wait_seconds}s; nothing published.")
+        return {}
+    if missing:
+        metrics.incr("shards_missing", len(missing))
+        logging.warning(f"Merging without shards {missing}; their feeds are skipped.")
+
+    scans = {p["name"]: NewsScan(p, news_sinks(p)) for p in profiles}
+    quotes, readings = {}, {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            partial = json.load(f)
+        quotes.update(partial["quotes"])
+        readings.update(partial["weather"])
+        for name, states in partial["news"].items():
+            if name in scans:
+                scans[name].absorb(Headline.from_state(state) for state in states)
+
+    # What the missing shards would have provided (the quotes come from shard 0) is fetched
+    # here, with the same timeouts as a normal run, rather than scored from placeholders.
+    missing_tickers = list(dict.fromkeys(t for p in profiles for t in (p["currency_ticker"], p["oil_ticker"]) if t not in quotes))
+    missing_cities = list(dict.fromkeys(city for p in profiles for city in p["locations"] if city not in readings))
+    if missing_tickers or missing_cities:
+        pool = ThreadPoolExecutor(max_workers=2)
+        pending = {
+            "market": pool.submit(_timed_source, "market", fetch_market_quotes, missing_tickers),
+            "weather": pool.submit(_timed_source, "weather", fetch_weather_readings, missing_cities),
+        }
+        for name, future in pending.items():
+            try:
+                fetched = future.result(timeout=SOURCE_TIMEOUTS[name])
+            except Exception as e:
+                logging.warning(f"{name} fetch for missing shards failed ({e or 'timeout'}). Using fallback.")
+                fetched = source_fallback(name, profiles, missing_tickers, missing_cities)
+            (quotes if name == "market" else readings).update(fetched)
+        pool.shutdown(wait=False)
+
+    records = {}
+    for p in profiles:
+        news_result = scans[p["name"]].finish()
+        save_to_cache(f"news_data:{p['name']}", news_result)
+        try:
+            records[p["name"]] = score_profile(p, news_result, quotes, readings)
+        except Exception as e:
+            logging.error(f"Profile {p['name']} failed: {e}")
+            end_live_scan(p)
+
+    scores = {name: record["Total_Risk"] for name, record in records.items()}
+    metrics.write_run_metrics({"run_timestamp": datetime.datetime.now(SL_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S"),
+                               "total_risk": scores, "run_id": run_id, "shards": count, "shards_missing": missing,
+                               "http_hosts": transport.host_stats(reset=True)})
+    logging.info(f"✅ MERGE COMPLETE [{run_id}]. Risk: {scores}. Data pushed to Firestore.")
+    return records
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Vita.lk risk scraper")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="Run under cProfile/tracemalloc and write reports to the profile directory.")
+    arg_parser.add_argument("--profile-dir", default=os.path.join(DATA_FOLDER, "profiles"),
+                            help="Where --profile writes its reports.")
+    arg_parser.add_argument("--enrich", action="store_true",
+                            help="Also score feed summaries / article bodies (same as VITA_ENRICH=1).")
+    arg_parser.add_argument("--scan-profiles", default=None,
+                            help="Comma-separated scan profiles to run (default: VITA_PROFILES or sri_lanka).")
+    arg_parser.add_argument("--serve", type=int, default=None, metavar="PORT",
+                            help="Also serve the latest snapshot over HTTP (see api_server.py) and keep scanning.")
+    arg_parser.add_argument("--host", default=None,
+                            help="Address --serve binds (default: localhost only; 0.0.0.0 for every interface).")
+    arg_parser.add_argument("--interval", type=int, default=None,
+                            help="Seconds between scans when running as a daemon (default with --serve: 900).")
+    arg_parser.add_argument("--shard", default=None, metavar="I/N",
+                            help="Scan partition I of N (0-based) and write a partial result for --merge.")
+    arg_parser.add_argument("--merge", type=int, default=None, metavar="N",
+                            help="Combine the N shard files of --run-id into the final score and push.")
+    arg_parser.add_argument("--run-id", default=None,
+                            help="Shared id of a sharded run. Required with --merge; --shard defaults to the "
+                                 "current 15 minute slot and logs the id it used.")
+    arg_parser.add_argument("--merge-wait", type=int, default=SHARD_MERGE_WAIT,
+                            help="Seconds --merge waits for missing shards.")
+    args = arg_parser.parse_args(argv)
+    # Each process computes the slot id itself, so a merge started after a slot boundary would
+    # look for a run that does not exist.
+    if args.merge and not args.run_id:
+        arg_parser.error("--merge needs the --run-id the shards were started with")
+    return args
+
+
+def run_daemon(profile_names, interval, serve_port=None, serve_host=None):
+    """Scans every `interval` seconds, publishing each run to the local read API when serving."""
+    api_server = None
+    if serve_port:
+        import api_server
+        api_server.refresh_from_disk(force=True)
+        api_server.start_server(serve_host or api_server.DEFAULT_HOST, serve_port)
+
+    while True:
+        started = time.time()
+        try:
+            records = run_scraper(profile_names)
+            if api_server and records:
+                api_server.publish_run(records)
+        except Exception as e:
+            logging.error(f"Scan failed: {e}")
+        time.sleep(max(0, interval - (time.time() - started)))
 
-    logging.info(f"✅ RUN COMPLETE. Risk: {final_score}. Data pushed to Firestore.")
 
 if __name__ == "__main__":
-    run_scraper()
+    args = parse_args()
+    profile_names = args.scan_profiles.split(",") if args.scan_profiles else None
+    if args.enrich:
+        ENRICH_ARTICLES = True
+    if args.shard:
+        shard_index, shard_count = (int(x) for x in args.shard.split("/"))
+        run_shard(shard_index, shard_count, args.run_id or shard_run_id(), profile_names)
+    elif args.merge:
+        if not merge_shards(args.run_id, args.merge, profile_names, args.merge_wait):
+            sys.exit(1)
+    elif args.profile:
+        import profiler
+        profiler.profile_run(lambda: run_scraper(profile_names), "scraper", args.profile_dir)
+    elif args.serve or args.interval:
+        run_daemon(profile_names, args.interval or 900, args.serve, args.host)
+    else:
+        run_scraper(profile_names)
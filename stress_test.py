@@ -0,0 +1,223 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import scraper
+
+
+STRESS_REPORT_FILE = os.path.join(scraper.DATA_FOLDER, "stress_test.json")
+
+# Dashboard bands in app.py: > 40 is ELEVATED, > 75 is CRITICAL.
+ELEVATED_THRESHOLD = 40
+CRITICAL_THRESHOLD = 75
+
+CHUNK_SIZE = 1_000_000
+PERCENTILES = [5, 25, 50, 75, 95, 99]
+
+# One-at-a-time bumps used for the sensitivity table.
+SENSITIVITY_BUMPS = {"usd": 1.0, "oil": 1.0, "rain": 1.0, "news": 1.0}
+
+
+def economy_risk(usd, oil, usd_baseline=290):
+    """Vectorised calculate_continuous_economy_risk."""
+    usd_risk = np.where(usd > usd_baseline, (usd - usd_baseline) * 1.5, 0.0)
+    oil_risk = np.where(oil > 80, (oil - 80) * 2, 0.0)
+    return np.minimum(100, np.trunc(usd_risk + oil_risk)).astype(np.int64)
+
+
+def environmental_risk(rain, flood_news):
+    """Vectorised calculate_dynamic_env_risk; `flood_news` marks scans with flood/landslide headlines."""
+    return np.minimum(100, np.trunc(15 + rain * 2.0 + np.where(flood_news, 50, 0))).astype(np.int64)
+
+
+def weighted_total_risk(news, eco, env, social, weights=None):
+    """Vectorised calculate_weighted_total_risk, including the 1.25 synergy factor."""
+    weights = weights or scraper.RISK_WEIGHTS
+    weighted = (eco * weights["eco"]) + (news * weights["news"]) + (social * weights["social"]) + (env * weights["env"])
+    synergy = np.where((eco > 60) & (social > 60), 1.25, 1.0)
+    return np.minimum(100, np.trunc(weighted * synergy)).astype(np.int64)
+
+
+def evaluate(inputs, profile):
+    """Runs the whole model over arrays of usd/oil/rain/news/flood_news inputs."""
+    eco = economy_risk(inputs["usd"], inputs["oil"], profile["usd_baseline"])
+    env = environmental_risk(inputs["rain"], inputs["flood_news"])
+    social = scraper.calculate_social_risk(inputs["news"], eco)
+    total = weighted_total_risk(inputs["news"], eco, env, social, profile["weights"])
+    return {"Total_Risk": total, "Economic_Risk": eco, "Environmental_Risk": env, "Social_Risk": social}
+
+
+def empirical_news_scores():
+    """Observed News_Risk values from risk_history.csv, used as the news distribution when present."""
+    try:
+        df = pd.read_csv(scraper.RISK_HISTORY_FILE, usecols=["News_Risk"])
+        values = pd.to_numeric(df["News_Risk"], errors="coerce").dropna().to_numpy()
+        return values if len(values) else None
+    except Exception:
+        return None
+
+
+def sample_inputs(rng, n, scenario, news_pool):
+    """Draws n scenarios: lognormal USD and oil, zero-inflated gamma rain, news from history or a beta."""
+    usd = scenario["usd_mean"] * rng.lognormal(-0.5 * scenario["usd_vol"] ** 2, scenario["usd_vol"], n)
+    oil = scenario["oil_mean"] * rng.lognormal(-0.5 * scenario["oil_vol"] ** 2, scenario["oil_vol"], n)
+    wet = rng.random(n) < scenario["wet_prob"]
+    rain = np.where(wet, rng.gamma(2.0, scenario["rain_mean"] / 2.0, n), 0.0)
+    if news_pool is not None:
+        news = rng.choice(news_pool, n)
+    else:
+        news = np.trunc(100 * rng.beta(2.0, 3.0, n))
+    flood_news = rng.random(n) < scenario["flood_news_prob"]
+    return {"usd": usd, "oil": oil, "rain": rain, "news": news, "flood_news": flood_news}
+
+
+def run_stress_test(samples, scenario, profile_name=scraper.DEFAULT_PROFILE, seed=None, chunk_size=CHUNK_SIZE):
+    profile = scraper.load_profiles()[profile_name]
+    rng = np.random.default_rng(seed)
+    news_pool = empirical_news_scores() if scenario["news_source"] == "history" else None
+
+    started = time.perf_counter()
+    histograms = {name: np.zeros(101, dtype=np.int64) for name in ["Total_Risk", "Economic_Risk", "Environmental_Risk", "Social_Risk"]}
+    input_sums = {}
+    bump_sums = {name: {"mean_delta": 0.0, "critical_delta": 0} for name in SENSITIVITY_BUMPS}
+    corr_inputs = None
+
+    done = 0
+    while done < samples:
+        n = min(chunk_size, samples - done)
+        inputs = sample_inputs(rng, n, scenario, news_pool)
+        scores = evaluate(inputs, profile)
+        total = scores["Total_Risk"]
+
+        for name, values in scores.items():
+            histograms[name] += np.bincount(np.clip(values, 0, 100), minlength=101)
+        for name in ["usd", "oil", "rain", "news"]:
+            input_sums[name] = input_sums.get(name, 0.0) + float(inputs[name].sum())
+
+        # Common random numbers: the bumped run reuses the same draws, so the difference is the effect.
+        critical = total > CRITICAL_THRESHOLD
+        for name, bump in SENSITIVITY_BUMPS.items():
+            bumped = dict(inputs)
+            bumped[name] = inputs[name] + bump
+            bumped_total = evaluate(bumped, profile)["Total_Risk"]
+            bump_sums[name]["mean_delta"] += float((bumped_total - total).sum())
+            bump_sums[name]["critical_delta"] += int((bumped_total > CRITICAL_THRESHOLD).sum() - critical.sum())
+
+        if corr_inputs is None:
+            corr_inputs = {name: np.corrcoef(inputs[name], total)[0, 1] for name in ["usd", "oil", "rain", "news"]}
+        done += n
+
+    elapsed = time.perf_counter() - started
+    total_hist = histograms["Total_Risk"]
+    cumulative = np.cumsum(total_hist) / samples
+
+    report = {
+        "profile": profile_name,
+        "samples": samples,
+        "seconds": round(elapsed, 3),
+        "scenario": scenario,
+        "input_means": {name: round(value / samples, 3) for name, value in input_sums.items()},
+        "total_risk": {
+            "mean": round(float((np.arange(101) * total_hist).sum() / samples), 3),
+            "percentiles": {f"p{p}": int(np.searchsorted(cumulative, p / 100)) for p in PERCENTILES},
+            "p_elevated": round(float(total_hist[ELEVATED_THRESHOLD + 1:].sum() / samples), 5),
+            "p_critical": round(float(total_hist[CRITICAL_THRESHOLD + 1:].sum() / samples), 5),
+        },
+        "component_means": {
+            name: round(float((np.arange(101) * hist).sum() / samples), 3)
+            for name, hist in histograms.items() if name != "Total_Risk"
+        },
+        "sensitivity": {
+            name: {
+                "bump": SENSITIVITY_BUMPS[name],
+                "mean_total_delta": round(sums["mean_delta"] / samples, 4),
+                "p_critical_delta": round(sums["critical_delta"] / samples, 5),
+                "correlation": round(float(np.nan_to_num(corr_inputs[name])), 4),
+            }
+            for name, sums in bump_sums.items()
+        },
+        "histogram": total_hist.tolist(),
+    }
+    return report
+
+
+def verify_against_scalar(n, scenario, profile_name=scraper.DEFAULT_PROFILE, seed=0):
+    """Checks the vectorised model against the scraper's own functions on n random scenarios."""
+    profile = scraper.load_profiles()[profile_name]
+    inputs = sample_inputs(np.random.default_rng(seed), n, scenario, None)
+    vector_total = evaluate(inputs, profile)["Total_Risk"]
+    # A scan with flood news is one headline the env formula's keyword check matches.
+    flood_scan = [scraper.Headline("Flood warning issued")]
+    mismatches = 0
+    for i in range(n):
+        eco = scraper.calculate_continuous_economy_risk(inputs["usd"][i], inputs["oil"][i], profile["usd_baseline"])
+        headlines = flood_scan if inputs["flood_news"][i] else []
+        env = scraper.calculate_dynamic_env_risk(headlines, max_rain=inputs["rain"][i], verbose=False)
+        social = scraper.calculate_social_risk(inputs["news"][i], eco)
+        total = scraper.calculate_weighted_total_risk(inputs["news"][i], eco, env, social, profile["weights"])
+        if total != vector_total[i]:
+            mismatches += 1
+    return mismatches
+
+
+def print_report(report):
+    total = report["total_risk"]
+    print(f"\n📈 Monte Carlo stress test [{report['profile']}]: {report['samples']:,} scenarios in {report['seconds']}s")
+    print(f"   Mean Total_Risk {total['mean']} | " + " ".join(f"{k}={v}" for k, v in total["percentiles"].items()))
+    print(f"   P(ELEVATED > {ELEVATED_THRESHOLD}) = {total['p_elevated']:.3%}   P(CRITICAL > {CRITICAL_THRESHOLD}) = {total['p_critical']:.3%}")
+    print("   Component means: " + ", ".join(f"{k} {v}" for k, v in report["component_means"].items()))
+    print("   Sensitivity (per +1 unit of input):")
+    for name, values in report["sensitivity"].items():
+        print(f"     {name:<5} mean Δ {values['mean_total_delta']:+.4f}  P(critical) Δ {values['p_critical_delta']:+.5f}  corr {values['correlation']:+.3f}")
+
+
+def default_scenario():
+    """Centres the market draws on the last stored quotes."""
+    usd_mean, oil_mean = 300.0, 75.0
+    try:
+        market = pd.read_csv(scraper.MARKET_DATA_FILE).iloc[-1]
+        usd_mean, oil_mean = float(market["usd_lkr"]), float(market["oil_price"])
+    except Exception:
+        pass
+    return {
+        "usd_mean": usd_mean, "usd_vol": 0.05,
+        "oil_mean": oil_mean, "oil_vol": 0.20,
+        "rain_mean": 15.0, "wet_prob": 0.4,
+        "flood_news_prob": 0.1,
+        "news_source": "history",
+    }
+
+
+if __name__ == "__main__":
+    scenario = default_scenario()
+    arg_parser = argparse.ArgumentParser(description="Monte Carlo stress test of the Vita.lk risk model")
+    arg_parser.add_argument("--samples", type=int, default=1_000_000)
+    arg_parser.add_argument("--seed", type=int, default=None)
+    arg_parser.add_argument("--scan-profile", default=scraper.DEFAULT_PROFILE)
+    for key, value in scenario.items():
+        if key == "news_source":
+            arg_parser.add_argument("--news-source", choices=["history", "beta"], default=value,
+                                    help="Sample News_Risk from risk_history.csv or a Beta(2,3) distribution.")
+        else:
+            arg_parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value)
+    arg_parser.add_argument("--verify", type=int, default=0,
+                            help="Also check N scenarios against the scraper's scalar functions.")
+    arg_parser.add_argument("--output", default=STRESS_REPORT_FILE)
+    args = arg_parser.parse_args()
+
+    scenario = {key: getattr(args, key) for key in scenario}
+    report = run_stress_test(args.samples, scenario, args.scan_profile, args.seed)
+    print_report(report)
+
+    if args.verify:
+        mismatches = verify_against_scalar(args.verify, scenario, args.scan_profile)
+        print(f"   Scalar check: {mismatches} mismatches in {args.verify} scenarios")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Stress test report written to {args.output}")
@@ -0,0 +1,247 @@
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+
+import metrics
+
+
+USER_AGENT = "Mozilla/5.0 (Vita.lk risk monitor)"
+DEFAULT_TIMEOUT = 10
+
+# Keep-alive pool: one pool per host for up to POOL_HOSTS hosts, POOL_SIZE idle connections each.
+POOL_HOSTS = 32
+POOL_SIZE = 8
+# At most this many requests in flight to any one host (news.google.com serves several feeds).
+PER_HOST_LIMIT = 4
+
+# Idempotent requests are retried on connection errors and these statuses, waiting
+# RETRY_BACKOFF * 2^n seconds between attempts, or the server's Retry-After up to
+# RETRY_AFTER_MAX. The host slot is released while waiting.
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.5
+RETRY_AFTER_MAX = 10
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(["GET", "HEAD"])
+
+# Addresses resolved by this transport's connections are reused for this long (seconds);
+# failed lookups are not cached. Nothing else in the process is affected.
+DNS_TTL = 300
+
+# Latency samples kept per host for the percentile in host_stats().
+LATENCY_SAMPLES = 512
+
+
+_LOCK = threading.Lock()
+_SESSION = None
+_HOST_LIMITS = {}
+_HOST_STATS = {}
+_DNS_CACHE = {}
+
+
+def resolve(host, port):
+    """Addresses for host:port from the TTL cache, looked up on a miss."""
+    now = time.monotonic()
+    cached = _DNS_CACHE.get((host, port))
+    if cached and cached[0] > now:
+        metrics.incr("dns_cache_hit")
+        return cached[1]
+    infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    _DNS_CACHE[(host, port)] = (now + DNS_TTL, addresses)
+    return addresses
+
+
+class _CachedDNSConnection:
+    """
+    Opens the socket to a cached address of the host, trying each in turn. The name is put
+    back before the socket is returned, so the Host header, SNI and certificate checks use it.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = resolve(host, self.port)
+        except OSError:
+            return super()._new_conn()  # urllib3 reports the failed lookup as usual
+        error = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except NewConnectionError as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+
+class CachedDNSHTTPConnection(_CachedDNSConnection, HTTPConnection):
+    pass
+
+
+class CachedDNSHTTPSConnection(_CachedDNSConnection, HTTPSConnection):
+    pass
+
+
+class CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDNSHTTPConnection
+
+
+class CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDNSHTTPSConnection
+
+
+def _host_limit(host):
+    with _LOCK:
+        if host not in _HOST_LIMITS:
+            _HOST_LIMITS[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _HOST_LIMITS[host]
+
+
+def _record(host, elapsed, ok):
+    with _LOCK:
+        stats = _HOST_STATS.setdefault(host, {"requests": 0, "errors": 0, "seconds": 0.0, "max": 0.0,
+                                              "samples": deque(maxlen=LATENCY_SAMPLES)})
+        stats["requests"] += 1
+        stats["errors"] += 0 if ok else 1
+        stats["seconds"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        stats["samples"].append(elapsed)
+
+
+@contextmanager
+def track(host):
+    """Times one request to `host` into the per-host stats and the run's metrics."""
+    ok = False
+    start = time.perf_counter()
+    try:
+        with metrics.stage("http", label=host):
+            yield
+        ok = True
+    finally:
+        _record(host, time.perf_counter() - start, ok)
+
+
+class CappedRetry(Retry):
+    """Retry schedule whose Retry-After waits are capped at RETRY_AFTER_MAX."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_AFTER_MAX)
+
+
+RETRY = CappedRetry(
+    total=RETRY_TOTAL,
+    backoff_factor=RETRY_BACKOFF,
+    status_forcelist=RETRY_STATUSES,
+    allowed_methods=RETRY_METHODS,
+    respect_retry_after_header=True,
+)
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    Keep-alive adapter with cached DNS. Each attempt holds a per-host slot until its body
+    has been read and is timed into the host's stats; retries back off with the slot released.
+    With stream=True only the time to the response headers is limited and timed.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedDNSHTTPConnectionPool,
+            "https": CachedDNSHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        host = urlsplit(request.url).hostname or ""
+        retry = RETRY
+        while True:
+            try:
+                with _host_limit(host), track(host):
+                    response = super().send(request, **kwargs)
+                    if not kwargs.get("stream"):
+                        response.content  # read the body while the slot is held
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if request.method not in RETRY_METHODS:
+                    raise
+                try:
+                    retry = retry.increment(request.method, request.url, error=e)
+                except MaxRetryError:
+                    raise e
+                metrics.incr("http_retries")
+                retry.sleep()
+                continue
+
+            if response.status_code in RETRY_STATUSES and request.method in RETRY_METHODS:
+                try:
+                    retry = retry.increment(request.method, request.url, response=response.raw)
+                except MaxRetryError:
+                    metrics.incr("http_errors")
+                    return response
+                metrics.incr("http_retries")
+                response.close()
+                retry.sleep(response.raw)
+                continue
+
+            if response.status_code >= 400:
+                metrics.incr("http_errors")
+            return response
+
+
+def build_session():
+    adapter = PooledAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def session():
+    """The process-wide session, created on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                _SESSION = build_session()
+    return _SESSION
+
+
+def get(url, **kwargs):
+    return session().get(url, **kwargs)
+
+
+def host_stats(reset=False):
+    """
+    Per-host request count, error count and latency (mean, p95, max in ms) up to the end of
+    the body, or of the headers for streamed requests.
+    """
+    with _LOCK:
+        report = {}
+        for host, stats in _HOST_STATS.items():
+            samples = sorted(stats["samples"])
+            report[host] = {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "mean_ms": round(1000 * stats["seconds"] / stats["requests"], 1),
+                "p95_ms": round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+                "max_ms": round(1000 * stats["max"], 1),
+            }
+        if reset:
+            _HOST_STATS.clear()
+    return report
+